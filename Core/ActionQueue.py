@@ -10,10 +10,13 @@ class ActionQueue:
         TR -> turn right
         TL -> turn left
         PB -> push block (or custom)
+        AB -> align with the block
+        HB / HF -> half a cell back / forward
     """
 
     def __init__(self):
         self.actions = deque()   # FIFO queue
+        self.source = None       # Optional lazy supplier of action sequences
 
     # ---- Add actions ----
     def add(self, action: str):
@@ -25,12 +28,31 @@ class ActionQueue:
         for action in seq:
             self.actions.append(action)
 
+    def set_source(self, source):
+        """
+        Pull more actions lazily from an iterable of action sequences
+        (e.g. PathPlanner.stream_mission). The next sequence is only
+        requested once the queue runs empty.
+        """
+        self.source = iter(source)
+
+    def _refill(self):
+        while not self.actions and self.source is not None:
+            try:
+                seq = next(self.source)
+            except StopIteration:
+                self.source = None
+                return
+            self.add_sequence(seq)
+
     # ---- Query ----
     def has_next(self) -> bool:
+        self._refill()
         return len(self.actions) > 0
 
     def peek(self):
         """Return next action without removing it."""
+        self._refill()
         if not self.actions:
             return None
         return self.actions[0]
@@ -38,6 +60,7 @@ class ActionQueue:
     # ---- Consume ----
     def next(self):
         """Pop and return next action (FIFO)."""
+        self._refill()
         if not self.actions:
             return None
         return self.actions.popleft()
@@ -45,6 +68,7 @@ class ActionQueue:
     # ---- Reset ----
     def clear(self):
         self.actions.clear()
+        self.source = None
 
     # ---- Debug / Utility ----
     def print_queue(self):
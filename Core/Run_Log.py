@@ -0,0 +1,208 @@
+import json
+import os
+import struct
+import threading
+from collections import deque
+
+# ---- File layout ----
+# MAGIC, then records, each starting with a one-byte type:
+#   RUN    : uint32 length + UTF-8 JSON metadata (arena, blocks, robot start, ...)
+#   ACTION : float64 t, uint8 action, int16 x, int16 y, uint16 angle,
+#            then int16 x, int16 y per block (in the order of the run's metadata)
+# Records are only ever appended; a record cut short by a crash is ignored.
+MAGIC = b"THYLOG1\n"
+REC_RUN = 0
+REC_ACTION = 1
+
+ACTION_CODES = {"F": 1, "B": 2, "TR": 3, "TL": 4, "PB": 5, "AB": 6, "HB": 7, "HF": 8}
+ACTION_NAMES = {code: name for name, code in ACTION_CODES.items()}
+
+_LENGTH = struct.Struct("<I")
+_ACTION = struct.Struct("<dBhhH")
+_CELL = struct.Struct("<hh")
+
+
+class LogEvent:
+    """One executed action and the world state right after it."""
+
+    def __init__(self, t, action, robot_pos, robot_angle, blocks):
+        self.t = t                      # Seconds since the run's first command
+        self.action = action
+        self.robot_pos = robot_pos
+        self.robot_angle = robot_angle  # Planner convention (0=East, 90=South)
+        self.blocks = blocks            # Block name -> (x, y)
+
+    def __repr__(self):
+        return f"LogEvent({self.t:.3f}s {self.action} robot={self.robot_pos}@{self.robot_angle})"
+
+
+class RunRecord:
+    """One run of a log file: its metadata and the events in order."""
+
+    def __init__(self, meta):
+        self.meta = meta
+        self.events = []
+
+    @property
+    def block_names(self):
+        return list(self.meta.get("blocks", {}))
+
+
+class ReplayReport:
+    """Outcome of replaying a run: steps executed and every mismatch with the log."""
+
+    def __init__(self, name):
+        self.name = name
+        self.steps = 0
+        self.diffs = []     # (step, action, what, expected, actual)
+
+    @property
+    def ok(self):
+        return not self.diffs
+
+    def compare(self, step, event, robot_pos, robot_angle, blocks):
+        """Record the differences between a logged event and the replayed world state."""
+        if tuple(robot_pos) != tuple(event.robot_pos):
+            self.diffs.append((step, event.action, "robot_pos", event.robot_pos, tuple(robot_pos)))
+        if robot_angle % 360 != event.robot_angle:
+            self.diffs.append((step, event.action, "robot_angle", event.robot_angle, robot_angle % 360))
+        for name, expected in event.blocks.items():
+            actual = blocks.get(name)
+            if actual is None or tuple(actual) != tuple(expected):
+                self.diffs.append((step, event.action, name, expected, actual))
+
+    def summary(self):
+        if self.ok:
+            return f"[{self.name}] replay OK: {self.steps} steps match the log"
+        lines = [f"[{self.name}] replay DIVERGED: {len(self.diffs)} differences in {self.steps} steps"]
+        for step, action, what, expected, actual in self.diffs[:10]:
+            lines.append(f"  step {step} ({action}): {what} expected {expected}, got {actual}")
+        if len(self.diffs) > 10:
+            lines.append(f"  ... {len(self.diffs) - 10} more")
+        return "\n".join(lines)
+
+
+class RunLogWriter:
+    """
+    Append-only binary run log with a background writer.
+
+    start_run() and log() only queue a tuple (no packing, no I/O), so they
+    are safe to call from the control loop; a daemon thread packs and
+    writes everything queued every flush_interval seconds, and close()
+    writes whatever is left.
+    """
+
+    def __init__(self, path, flush_interval=0.2):
+        self.path = path
+        self.flush_interval = flush_interval
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            with open(path, "rb") as f:
+                data = f.read()
+            _, end = _parse(data, path)
+            if end < len(data):
+                # Drop the torn record of a crashed run, so new records stay aligned
+                os.truncate(path, end)
+        self._file = open(path, "ab")
+        if new_file:
+            self._file.write(MAGIC)
+
+        self._pending = deque()     # deque.append / popleft are thread safe
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ---------------- Control loop side -----------------
+    def start_run(self, meta):
+        """Begin a new run; meta["blocks"] fixes the block order of its records."""
+        self._pending.append((REC_RUN, meta))
+
+    def log(self, t, action, robot_pos, robot_angle, blocks):
+        """Queue one executed action; blocks is a sequence of (x, y) in the run's block order."""
+        self._pending.append((REC_ACTION, (t, action, robot_pos, robot_angle, blocks)))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self._drain()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------------- Writer thread -----------------
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._drain()
+
+    def _drain(self):
+        chunks = []
+        while self._pending:
+            kind, data = self._pending.popleft()
+            if kind == REC_RUN:
+                payload = json.dumps(data).encode()
+                chunks.append(bytes([REC_RUN]) + _LENGTH.pack(len(payload)) + payload)
+            else:
+                t, action, (x, y), angle, blocks = data
+                parts = [bytes([REC_ACTION]), _ACTION.pack(t, ACTION_CODES.get(action, 0), x, y, angle % 360)]
+                parts.extend(_CELL.pack(bx, by) for bx, by in blocks)
+                chunks.append(b"".join(parts))
+        if chunks:
+            self._file.write(b"".join(chunks))
+            self._file.flush()
+
+
+def read_run_log(path):
+    """Parse a run log; returns a list of RunRecord (a truncated last record is dropped)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return _parse(data, path)[0]
+
+
+def _parse(data, path):
+    """Return (runs, end of the last complete record)."""
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a run log")
+
+    runs = []
+    end = pos = len(MAGIC)
+    while pos < len(data):
+        kind = data[pos]
+        pos += 1
+        if kind == REC_RUN:
+            if pos + _LENGTH.size > len(data):
+                break
+            (length,) = _LENGTH.unpack_from(data, pos)
+            pos += _LENGTH.size
+            if pos + length > len(data):
+                break
+            runs.append(RunRecord(json.loads(data[pos:pos + length])))
+            pos += length
+        elif kind == REC_ACTION:
+            if not runs:
+                raise ValueError(f"{path}: action record before any run")
+            names = runs[-1].block_names
+            size = _ACTION.size + _CELL.size * len(names)
+            if pos + size > len(data):
+                break
+            t, code, x, y, angle = _ACTION.unpack_from(data, pos)
+            blocks = {}
+            offset = pos + _ACTION.size
+            for name in names:
+                blocks[name] = _CELL.unpack_from(data, offset)
+                offset += _CELL.size
+            runs[-1].events.append(LogEvent(t, ACTION_NAMES.get(code, "?"), (x, y), angle, blocks))
+            pos += size
+        else:
+            raise ValueError(f"{path}: unknown record type {kind} at byte {pos - 1}")
+        end = pos
+    return runs, end
@@ -29,6 +29,43 @@ class RobotInterface(ABC):
         """Rotates the robot 180 degrees."""
         pass
 
+    @abstractmethod
+    def align_block(self):
+        """Aligns with the block right in front and approaches it."""
+        pass
+
+    @abstractmethod
+    def half_back(self):
+        """Backs off half a cell."""
+        pass
+
+    @abstractmethod
+    def half_forward(self):
+        """Moves half a cell forward again after half_back()."""
+        pass
+
+    def execute(self, action):
+        """Run one ActionQueue command; returns False if the command is unknown."""
+        if action == "F":
+            self.move_forward()
+        elif action == "B":
+            self.move_backward()
+        elif action == "TR":
+            self.rotate_right()
+        elif action == "TL":
+            self.rotate_left()
+        elif action == "PB":
+            self.find_block()
+        elif action == "AB":
+            self.align_block()
+        elif action == "HB":
+            self.half_back()
+        elif action == "HF":
+            self.half_forward()
+        else:
+            return False
+        return True
+
     @abstractmethod
     def get_position(self):
         """Returns pixel position + orientation (x, y, theta_radians)."""
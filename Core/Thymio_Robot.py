@@ -1,19 +1,49 @@
 from Core.Thymio_Interface import RobotInterface
 from tdmclient import ClientAsync
 import asyncio
+import threading
 
 class RealThymio(RobotInterface):
-   
-    def __init__(self):
-        # Connect to Thymio Device Manager
-        self.client = ClientAsync()
-        self.loop = asyncio.get_event_loop()
-        self.loop.run_until_complete(self._connect())
+
+    def __init__(self, connect=True):
+        # Own event loop, so connecting can happen on a background thread
+        self.loop = asyncio.new_event_loop()
+        self.client = None
+        self.node = None
+        self._connected = threading.Event()
+        self._connect_error = None
 
         self.x = 0
         self.y = 0
         self.theta = 0
 
+        if connect:
+            self.connect()
+
+    def connect(self):
+        """Blocking: connect to the Thymio Device Manager and wait for a node."""
+        try:
+            asyncio.set_event_loop(self.loop)
+            self.client = ClientAsync()
+            self.loop.run_until_complete(self._connect())
+        except Exception as e:
+            self._connect_error = e
+            raise
+        finally:
+            self._connected.set()
+
+    def connect_async(self):
+        """Start connecting on a background thread; commands wait for it."""
+        thread = threading.Thread(target=self.connect, daemon=True)
+        thread.start()
+        return thread
+
+    def wait_connected(self, timeout=None):
+        if not self._connected.wait(timeout):
+            raise TimeoutError("Thymio connection not ready")
+        if self._connect_error is not None:
+            raise self._connect_error
+
     async def _connect(self):
         await self.client.connect()
         self.node = await self.client.wait_for_node()
@@ -27,8 +57,14 @@ class RealThymio(RobotInterface):
         self._send_event("forward")
 
     def move_backward(self):
+        self._send_event("backwards")
+
+    def half_back(self):
         self._send_event("half_back")
 
+    def half_forward(self):
+        self._send_event("half_forward")
+
     def rotate_left(self):
         self._send_event("left")
 
@@ -39,6 +75,11 @@ class RealThymio(RobotInterface):
         # Example placeholder
         print("Block detection not implemented.")
 
+    def align_block(self):
+        # "AB" primitive: square up against the block, then close the gap
+        self._send_event("align_block")
+        self._send_event("approach_block")
+
     def stop(self):
         self._send_event("stop")
 
@@ -46,6 +87,8 @@ class RealThymio(RobotInterface):
 
     # ---------------- Helpers ----------------
     def _send_event(self, event_name):
+        self.wait_connected()
+
         async def _inner():
             await self.node.send_event(event_name)
             # Wait for 'performed' callback
@@ -68,4 +111,3 @@ class RealThymio(RobotInterface):
 
     def set_block_manager(self, block_manager):
         print("Block manager set in RealThymio (ignored).")
-
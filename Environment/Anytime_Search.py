@@ -0,0 +1,109 @@
+import threading
+
+from Environment.a_star import SearchBudget, SearchBudgetExceeded, astar, path_cost
+
+# Heuristic weights tried in order; the last round (1.0) is the optimal search
+DEFAULT_WEIGHTS = (3.0, 2.0, 1.5, 1.25, 1.0)
+
+
+class AnytimeSearch:
+    """
+    Anytime planner on top of a weighted search (restarting weighted A*).
+
+    search_fn(weight, budget) -> path ([] if none) runs one weighted search.
+    The first, most greedy round runs without a budget, so a path with cost
+    <= weights[0] * optimal always comes quickly; the remaining rounds share
+    the time / expansion budget and replace best whenever they find a cheaper
+    path, until the optimal round is done, the budget runs out or cancel()
+    is called.
+
+    best  : cheapest path found so far ([] if none)
+    bound : weight of the last finished round (best costs <= bound * optimal)
+    first : Event set once the first round is done
+    done  : Event set once refinement stops
+    """
+
+    def __init__(self, search_fn, cost_fn, weights=DEFAULT_WEIGHTS, time_budget=None, expansion_budget=None):
+        self.search_fn = search_fn
+        self.cost_fn = cost_fn
+        self.weights = tuple(weights)
+        self.time_budget = time_budget
+        self.expansion_budget = expansion_budget
+
+        self.best = []
+        self.best_cost = None
+        self.bound = None
+        self.rounds = 0                     # Finished search rounds
+        self.first = threading.Event()
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._budget = None
+        self._thread = None
+
+    # ---------------- Control -----------------
+    def start(self, background=True):
+        """Run every round on a daemon thread (or inline if background=False); returns self."""
+        self._budget = SearchBudget(self.time_budget, self.expansion_budget)
+        if background:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        else:
+            self._run()
+        return self
+
+    def cancel(self):
+        """Stop refining; best keeps the cheapest path found so far."""
+        if self._budget is not None:
+            self._budget.cancel()
+
+    def wait(self, timeout=None):
+        """Block until refinement stops (or timeout); returns best."""
+        self.done.wait(timeout)
+        return self.result()
+
+    def take(self):
+        """Wait for the first path, stop refining and return the best one found."""
+        self.first.wait()
+        self.cancel()
+        return self.result()
+
+    def result(self):
+        with self._lock:
+            return list(self.best)
+
+    # ---------------- Internals -----------------
+    def _round(self, weight, budget):
+        path = self.search_fn(weight, budget)
+        self.rounds += 1
+        if not path:
+            return
+        cost = self.cost_fn(path)
+        with self._lock:
+            if self.best_cost is None or cost < self.best_cost:
+                self.best, self.best_cost = path, cost
+            # Finding nothing cheaper still proves the tighter bound
+            self.bound = weight
+
+    def _run(self):
+        try:
+            self._round(self.weights[0], None)
+            self.first.set()
+            for weight in self.weights[1:]:
+                self._round(weight, self._budget)
+        except SearchBudgetExceeded:
+            pass
+        finally:
+            self.first.set()
+            self.done.set()
+
+
+def anytime_astar(gridmap, start, goal, turn_penalty=2.5, time_budget=None, expansion_budget=None,
+                  weights=DEFAULT_WEIGHTS, background=True):
+    """AnytimeSearch over a_star.astar; the returned search is already started."""
+    def search(weight, budget):
+        return astar(gridmap, start, goal, turn_penalty=turn_penalty, weight=weight, budget=budget)
+
+    def cost(path):
+        return path_cost(path, turn_penalty)
+
+    return AnytimeSearch(search, cost, weights, time_budget, expansion_budget).start(background)
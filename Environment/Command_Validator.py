@@ -0,0 +1,161 @@
+from array import array
+
+from Environment.Grid_Map import FREE
+
+# Planner convention: 0=East, 90=South (Y+ down), 180=West, 270=North
+HEADINGS = {0: (1, 0), 90: (0, 1), 180: (-1, 0), 270: (0, -1)}
+
+WALL = -1   # Occupancy codes: WALL, 0 = free, k > 0 = k-th block
+_TO_CODE = bytes([0, 0xFF]) + bytes(254)    # bytes.translate table: 1 -> WALL (as a signed char)
+
+
+class ValidationResult:
+    """
+    Outcome of validate_commands().
+
+    ok            : every command can be executed
+    step, command : index and name of the first failing command (None if ok)
+    reason        : why it fails (None if ok)
+    robot_pos, robot_angle, blocks : world state after the last valid command
+                    (blocks maps block name -> (x, y))
+    """
+
+    def __init__(self, ok, step, command, reason, robot_pos, robot_angle, blocks):
+        self.ok = ok
+        self.step = step
+        self.command = command
+        self.reason = reason
+        self.robot_pos = robot_pos
+        self.robot_angle = robot_angle
+        self.blocks = blocks
+
+    def summary(self):
+        if self.ok:
+            return f"OK: robot ends at {self.robot_pos} facing {self.robot_angle}"
+        return f"INVALID at step {self.step} ({self.command}): {self.reason}"
+
+
+def _occupancy(grid, width, height):
+    """Flat occupancy array (gx * height + gy): WALL for every non-FREE cell, else 0."""
+    cells = getattr(grid, "grid", None)
+    if cells is not None:
+        # grid[x][y] columns concatenate to exactly the flat id order
+        flat = bytearray()
+        for column in cells:
+            flat.extend(map(FREE.__ne__, column))
+    else:
+        flat = bytearray(grid.get_cell(x, y) != FREE for x in range(width) for y in range(height))
+    # 1 -> 0xff, i.e. WALL as a signed char; widened to ints for the block codes
+    return array("i", array("b", flat.translate(_TO_CODE)))
+
+
+def validate_commands(grid, block_manager, robot_pos, robot_angle, commands, block_positions=None):
+    """
+    Simulate commands against grid (walls) and block_manager (blocks) in one
+    pass, without touching either. Stricter than the grid simulators
+    (HeadlessThymio / SimThymio), which only know about blocks: they drive
+    through walls and off the arena, and push a block behind the robot on B.
+    Sequences valid here simulate to the same world there; every command the
+    robot can't carry out is reported instead:
+
+      F      move one cell; a block in front is pushed if the cell behind it is free
+      B      move one cell back (never into a block)
+      TR/TL  turn 90 degrees right / left on the spot
+      PB     turn around (180 degrees)
+      AB     align + approach: needs a block right in front
+      HB/HF  half a cell back, then forward again (the robot keeps its cell);
+             HB needs the cell behind free, and only HF may follow it: any
+             other command would leave the robot off the cell centres
+
+    block_positions: optional {name: (x, y)} overriding block_manager's
+    positions, e.g. the .blocks of a previous result to chain missions.
+    Returns a ValidationResult.
+    """
+    width, height = grid.width_cells, grid.height_cells
+    occupancy = _occupancy(grid, width, height)
+
+    # Blocks are one cell, at their (rounded down) position, as in the simulator
+    names = [None]
+    positions = dict(block_positions or {})
+    for name, block in block_manager.blocks.items():
+        x, y = positions.get(name, (int(block.x), int(block.y)))
+        names.append(name)
+        positions[name] = (x, y)
+        if 0 <= x < width and 0 <= y < height and occupancy[x * height + y] == 0:
+            occupancy[x * height + y] = len(names) - 1
+
+    (x, y), angle = robot_pos, robot_angle % 360
+    pulled_back = False
+
+    def result(ok, step=None, command=None, reason=None):
+        return ValidationResult(ok, step, command, reason, (x, y), angle, dict(positions))
+
+    def describe(code, cx, cy):
+        if code == WALL:
+            return f"an obstacle at {(cx, cy)}"
+        return f"block {names[code]} at {(cx, cy)}"
+
+    for step, command in enumerate(commands):
+        if pulled_back != (command == "HF"):
+            if pulled_back:
+                return result(False, step, command, "robot is half a cell back, only HF can follow HB")
+            return result(False, step, command, "HF without HB first")
+        if command in ("TR", "TL", "PB"):
+            angle = (angle + {"TR": 90, "TL": -90, "PB": 180}[command]) % 360
+            continue
+
+        heading = HEADINGS.get(angle)
+        if heading is None:
+            return result(False, step, command, f"robot heading {angle} is not grid aligned")
+        dx, dy = heading
+
+        if command == "F":
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                return result(False, step, command, "robot leaves the arena")
+            code = occupancy[nx * height + ny]
+            if code == WALL:
+                return result(False, step, command, f"robot drives into {describe(code, nx, ny)}")
+            if code > 0:
+                bx, by = nx + dx, ny + dy
+                if not (0 <= bx < width and 0 <= by < height):
+                    return result(False, step, command, f"push of {names[code]} leaves the arena")
+                target = occupancy[bx * height + by]
+                if target != 0:
+                    return result(False, step, command,
+                                  f"push of {names[code]} blocked by {describe(target, bx, by)}")
+                occupancy[bx * height + by] = code
+                occupancy[nx * height + ny] = 0
+                positions[names[code]] = (bx, by)
+            x, y = nx, ny
+
+        elif command == "B":
+            nx, ny = x - dx, y - dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                return result(False, step, command, "robot leaves the arena")
+            code = occupancy[nx * height + ny]
+            if code != 0:
+                return result(False, step, command, f"robot backs into {describe(code, nx, ny)}")
+            x, y = nx, ny
+
+        elif command == "HB":
+            nx, ny = x - dx, y - dy
+            if not (0 <= nx < width and 0 <= ny < height):
+                return result(False, step, command, "robot pulls back out of the arena")
+            code = occupancy[nx * height + ny]
+            if code != 0:
+                return result(False, step, command, f"robot pulls back into {describe(code, nx, ny)}")
+            pulled_back = True
+
+        elif command == "HF":
+            pulled_back = False
+
+        elif command == "AB":
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < width and 0 <= ny < height) or occupancy[nx * height + ny] <= 0:
+                return result(False, step, command, "no block in front to align with")
+
+        else:
+            return result(False, step, command, f"unknown command {command!r}")
+
+    return result(True)
@@ -0,0 +1,159 @@
+import threading
+import weakref
+from collections import deque
+
+from Environment.Grid_Map import FREE, GridOverlay
+from Environment.Push_Rules import DIRECTIONS
+
+# One DeadlockTable per arena (base grid); dropped together with the grid
+_tables = weakref.WeakKeyDictionary()
+_tables_lock = threading.Lock()
+
+
+def _static_view(grid):
+    """Walk down the overlays: return (base grid, cells freed on top of it)."""
+    freed = set()
+    while isinstance(grid, GridOverlay):
+        freed |= grid.free
+        grid = grid.base
+    return grid, frozenset(freed)
+
+
+class DeadlockTable:
+    """
+    Static deadlock table of one arena.
+
+    For each goal it stores the "live" squares: cells from which a block can
+    still be pushed onto the goal, considering walls only (relaxed: the robot
+    is assumed to reach any free cell). Every other cell is a dead square.
+    Recomputed lazily when the arena's version changes. Thread safe: planning
+    threads share one table per arena (e.g. PlanningService workers).
+    """
+
+    def __init__(self, base):
+        self._base = weakref.ref(base)     # Weak: _tables must not keep the arena alive
+        self._lock = threading.Lock()
+        self.version = None
+        self.passable = None    # Flat bytearray of FREE cells (gx * height + gy)
+        self.live = {}          # (goal, freed cells) -> frozenset of live cells
+
+    def live_squares(self, goal, freed=frozenset()):
+        base = self._base()
+        with self._lock:
+            version = getattr(base, "version", 0)
+            if version != self.version:
+                self.live.clear()
+                self.passable = None
+                self.version = version
+
+            key = (goal, freed)
+            live = self.live.get(key)
+            if live is None:
+                live = self._compute(base, goal, freed)
+                self.live[key] = live
+            return live
+
+    def _compute(self, base, goal, freed):
+        w = base.width_cells
+        h = base.height_cells
+
+        if self.passable is None:
+            self.passable = bytearray(
+                1 if base.get_cell(x, y) == FREE else 0
+                for x in range(w) for y in range(h)
+            )
+        passable = self.passable
+        freed_ids = {x * h + y for x, y in freed if 0 <= x < w and 0 <= y < h}
+
+        # Reverse push search: the block reached c from p = c - d,
+        # pushed by the robot standing at p - d.
+        goal_id = goal[0] * h + goal[1]
+        live = {goal_id}
+        frontier = deque([goal_id])
+        while frontier:
+            c = frontier.popleft()
+            cx, cy = divmod(c, h)
+            for dx, dy in DIRECTIONS:
+                px, py = cx - dx, cy - dy
+                rx, ry = px - dx, py - dy
+                if not (0 <= px < w and 0 <= py < h and 0 <= rx < w and 0 <= ry < h):
+                    continue
+                p = px * h + py
+                if p in live:
+                    continue
+                r = rx * h + ry
+                if (passable[p] or p in freed_ids) and (passable[r] or r in freed_ids):
+                    live.add(p)
+                    frontier.append(p)
+
+        return frozenset(divmod(i, h) for i in live)
+
+
+def live_squares(grid, goal):
+    """Cells of grid's arena from which a block can still be pushed onto goal."""
+    base, freed = _static_view(grid)
+    with _tables_lock:
+        table = _tables.get(base)
+        if table is None:
+            table = DeadlockTable(base)
+            _tables[base] = table
+    return table.live_squares(goal, freed)
+
+
+def is_frozen(grid, cell, extra_blocked=()):
+    """
+    True if a block on cell can't be pushed along either axis: an axis needs
+    both neighbours free (one for the block to move into, one for the robot).
+    """
+    x, y = cell
+
+    def free(c):
+        return c not in extra_blocked and grid.get_cell(c[0], c[1]) == FREE
+
+    horizontal = free((x + 1, y)) and free((x - 1, y))
+    vertical = free((x, y + 1)) and free((x, y - 1))
+    return not horizontal and not vertical
+
+
+def make_pruner(grid, goal, pending=(), static_grid=None):
+    """
+    Build prune(cell) for the block search: True if pushing the active block
+    onto cell can never lead to a finished structure.
+
+    grid        : planning grid (walls + every other block); its arena's
+                  dead squares are looked up for goal
+    pending     : cells of other blocks that still have to move
+    static_grid : obstacles that will never move (defaults to the bare arena);
+                  used to decide whether a pending block gets frozen
+    """
+    live = live_squares(grid, goal)
+    pending = set(pending)
+    if static_grid is None:
+        static_grid = _static_view(grid)[0]
+
+    checked = {}    # The grids don't change during one search: remember every answer
+
+    def is_deadlocked(cell):
+        # Static dead square (corner, dead wall line, ...)
+        # (A frozen active block needs no check here: the search already
+        # refuses pushes without a free target and a free robot cell.)
+        if cell not in live:
+            return True
+
+        # Active block freezes a block that still has to move. Passing by
+        # only blocks it for a moment, so that counts only where the active
+        # block stays: on its goal, or frozen itself by that same neighbour.
+        x, y = cell
+        for n in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]:
+            if n in pending and is_frozen(static_grid, n, extra_blocked=(cell,)):
+                if cell == goal or is_frozen(static_grid, cell, extra_blocked=(n,)):
+                    return True
+        return False
+
+    def prune(cell):
+        result = checked.get(cell)
+        if result is None:
+            result = checked[cell] = is_deadlocked(cell)
+        return result
+
+    return prune
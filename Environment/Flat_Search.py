@@ -0,0 +1,255 @@
+import heapq
+import threading
+import weakref
+from array import array
+from contextlib import contextmanager
+
+from Environment.Grid_Map import FREE, GridOverlay
+
+# Heap entries are single ints: (quantized f << ID_BITS) | cell id
+ID_BITS = 32
+ID_MASK = (1 << ID_BITS) - 1
+F_SCALE = 1024          # f is stored in 1/1024 steps (costs here are multiples of 0.5)
+_PASSABLE = bytes([1]) + bytes(255)     # bytes.translate table: FREE (0) -> 1, anything else -> 0
+
+# Idle searchers per arena. A searcher's scratch arrays serve one query at a
+# time, so concurrent queries (planner threads, anytime refiners) borrow
+# their own instead of sharing one.
+_pools = weakref.WeakKeyDictionary()
+_pools_lock = threading.Lock()
+
+
+def _base_of(grid):
+    while isinstance(grid, GridOverlay):
+        grid = grid.base
+    return grid
+
+
+@contextmanager
+def borrow_searcher(grid):
+    """Borrow an idle FlatGridSearch for grid's arena (overlays share their base's)."""
+    base = _base_of(grid)
+    with _pools_lock:
+        idle = _pools.setdefault(base, [])
+        searcher = idle.pop() if idle else None
+    if searcher is None:
+        searcher = FlatGridSearch(base)
+    try:
+        yield searcher
+    finally:
+        with _pools_lock:
+            _pools.setdefault(base, []).append(searcher)
+
+
+class FlatGridSearch:
+    """
+    Memory-lean A* core for one arena.
+
+    Cells are flat ids (gx * height + gy). g-scores, parents and visit stamps
+    live in arrays allocated once and reused by every query: a cell's entries
+    only count if its stamp equals the current generation, so nothing is
+    cleared between queries. The open set is a heapq of packed ints (no tuples),
+    stale entries are skipped by comparing them with the cell's current key.
+
+    Overlays are handled by patching their cells into the passable bytearray
+    for the duration of one query and restoring them afterwards.
+    """
+
+    def __init__(self, base):
+        # Weak: the pools are keyed by the arena and must not keep it alive
+        self._base = weakref.ref(base)
+        self.width = base.width_cells
+        self.height = base.height_cells
+        n = self.width * self.height
+
+        self.version = None
+        self.passable = None                    # bytearray, 1 = FREE
+        self.g = array("d", bytes(8 * n))
+        self.key = array("Q", bytes(8 * n))     # Heap key of the cell's live open entry
+        self.parent = array("i", bytes(4 * n))
+        self.stamp = array("I", bytes(4 * n))
+        self.generation = 0
+
+    # ---------------- Grid -----------------
+    def _refresh(self):
+        base = self._base()
+        version = getattr(base, "version", 0)
+        if self.passable is not None and version == self.version:
+            return
+        cells = getattr(base, "grid", None)
+        flat = getattr(base, "flat_cells", None)
+        if flat is not None:
+            # Already in flat id order (World_State.SharedGridView)
+            self.passable = bytearray(bytes(flat).translate(_PASSABLE))
+        elif cells is not None:
+            # grid[x][y] columns concatenate to exactly the flat id order
+            self.passable = bytearray()
+            for column in cells:
+                self.passable.extend(map(FREE.__eq__, column))
+        else:
+            self.passable = bytearray(
+                base.get_cell(x, y) == FREE for x in range(self.width) for y in range(self.height)
+            )
+        self.version = version
+
+    def _patch(self, grid):
+        """Write grid's overlay cells into passable; returns what to restore."""
+        levels = []
+        while isinstance(grid, GridOverlay):
+            levels.append(grid)
+            grid = grid.base
+
+        h = self.height
+        passable = self.passable
+        saved = {}
+        for level in reversed(levels):      # Bottom overlay first, the top one wins
+            for value, cells in ((0, level.blocked - level.free), (1, level.free)):
+                for x, y in cells:
+                    if 0 <= x < self.width and 0 <= y < h:
+                        i = x * h + y
+                        if i not in saved:
+                            saved[i] = passable[i]
+                        passable[i] = value
+        return saved
+
+    def _restore(self, saved):
+        passable = self.passable
+        for i, value in saved.items():
+            passable[i] = value
+
+    def _next_generation(self):
+        self.generation += 1
+        if self.generation > 0xFFFFFFFF:
+            self.stamp = array("I", bytes(4 * self.width * self.height))
+            self.generation = 1
+        return self.generation
+
+    # ---------------- Search -----------------
+    def search(self, grid, start, goal, turn_penalty=2.5, weight=1.0, heuristic=None, start_dir=None,
+               push=False, prune=None, budget=None, stats=None, maneuvers=None):
+        """
+        A* from start to goal on grid (this searcher's arena or an overlay of it).
+        Same costs as a_star.astar: 1 per move + turn_penalty per turn. Like
+        the dict searches it keys states by cell only, so with turn penalties
+        the path found can depend on expansion order (and differ from theirs).
+
+        heuristic : optional h(cell, goal); defaults to Manhattan distance
+        start_dir : direction already travelled at start (first turn is penalized)
+        push      : block search rules (the cell behind the mover must be free,
+                    as in PathPlanner.get_weighted_block_path)
+        prune     : optional prune(cell) -> True for cells never to enter
+        budget    : optional SearchBudget (raises SearchBudgetExceeded)
+        stats     : optional SearchStats (counters + profiler hooks)
+        maneuvers : optional ManeuverLibrary; turns it has no maneuver for
+                    are not taken (except at start, see get_weighted_block_path)
+        Returns the path as a list of (x, y), [] if there is none.
+        """
+        self._refresh()
+        saved = self._patch(grid)
+        try:
+            return self._search(start, goal, turn_penalty, weight, heuristic, start_dir, push, prune, budget,
+                                stats, maneuvers)
+        finally:
+            self._restore(saved)
+
+    def _search(self, start, goal, turn_penalty, weight, heuristic, start_dir, push, prune, budget, stats,
+                maneuvers):
+        w, h = self.width, self.height
+        passable, g, key, parent, stamp = self.passable, self.g, self.key, self.parent, self.stamp
+        gen = self._next_generation()
+
+        gx, gy = goal
+        start_id = start[0] * h + start[1]
+        goal_id = gx * h + gy
+        # Flat step per direction, in the planners' order: E, W, S, N
+        steps = ((1, 0, h), (-1, 0, -h), (0, 1, 1), (0, -1, -1))
+        start_step = None
+        if start_dir is not None:
+            start_step = start_dir[0] * h + start_dir[1]
+
+        est = heuristic(start, goal) if heuristic is not None else abs(start[0] - gx) + abs(start[1] - gy)
+        stamp[start_id] = gen
+        g[start_id] = 0.0
+        key[start_id] = int(weight * est * F_SCALE)
+        parent[start_id] = -1
+        open_set = [(key[start_id] << ID_BITS) | start_id]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        if stats is not None:
+            stats.begin()
+            stats.pushed(tuple(start), 0.0, 1)
+
+        while open_set:
+            entry = heappop(open_set)
+            current = entry & ID_MASK
+            if stats is not None:
+                stats.popped(divmod(current, h))
+            if entry >> ID_BITS != key[current]:
+                continue    # Stale: the cell was reached more cheaply since
+            cost = g[current]
+
+            if budget is not None:
+                budget.charge()
+
+            if current == goal_id:
+                path = []
+                while current != -1:
+                    path.append(divmod(current, h))
+                    current = parent[current]
+                path.reverse()
+                return path
+
+            cx, cy = divmod(current, h)
+            if stats is not None:
+                stats.expanding((cx, cy), cost)
+            prev = parent[current]
+            last_step = current - prev if prev != -1 else start_step
+
+            for dx, dy, step in steps:
+                nx, ny = cx + dx, cy + dy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                n = current + step
+                if not passable[n]:
+                    continue
+                if push:
+                    # The robot stands behind the mover (the start cell counts as free)
+                    bx, by = cx - dx, cy - dy
+                    behind = current - step
+                    if not (0 <= bx < w and 0 <= by < h) or (not passable[behind] and behind != start_id):
+                        continue
+                if prune is not None and prune((nx, ny)):
+                    continue
+
+                new_g = cost + 1
+                turn = last_step is not None and last_step != step
+                if turn:
+                    new_g += turn_penalty
+
+                if stamp[n] != gen or new_g < g[n]:
+                    if turn and maneuvers is not None and prev != -1:
+                        px, py = divmod(prev, h)
+                        if not maneuvers.feasible_flat(passable, w, h, (cx, cy), (cx - px, cy - py), (dx, dy)):
+                            continue
+                    if heuristic is None:
+                        est = abs(nx - gx) + abs(ny - gy)
+                    else:
+                        est = heuristic((nx, ny), goal)
+                    f = int((new_g + weight * est) * F_SCALE)
+                    stamp[n] = gen
+                    g[n] = new_g
+                    key[n] = f
+                    parent[n] = current
+                    heappush(open_set, (f << ID_BITS) | n)
+                    if stats is not None:
+                        stats.pushed((nx, ny), new_g, len(open_set))
+
+        return []
+
+
+def flat_astar(gridmap, start, goal, turn_penalty=2.5, weight=1.0, budget=None, stats=None):
+    """Drop-in for a_star.astar on the flat core."""
+    if hasattr(gridmap, "connected") and not gridmap.connected(start, goal):
+        return []
+    with borrow_searcher(gridmap) as searcher:
+        return searcher.search(gridmap, start, goal, turn_penalty=turn_penalty, weight=weight, budget=budget,
+                               stats=stats)
@@ -22,19 +22,60 @@ class GridMap:
             for _ in range(self.width_cells)
         ]
 
+        self.version = 0            # Bumped on every change made through set_cell / clear
+        self._components = None     # ConnectivityIndex, built on first connected() query
+
     # ---------------- Grid access -----------------
     def is_inside(self, gx, gy):
         return 0 <= gx < self.width_cells and 0 <= gy < self.height_cells
 
     def set_cell(self, gx, gy, value):
         if self.is_inside(gx, gy):
+            old = self.grid[gx][gy]
+            if old == value:
+                return
             self.grid[gx][gy] = value
+            self.version += 1
+
+            if self._components is not None:
+                if value == FREE:
+                    # Freeing a cell only merges components: cheap incremental update
+                    self._components.add_free(gx, gy)
+                elif old == FREE:
+                    # Union-find can't split components; rebuild on next query
+                    self._components = None
 
     def get_cell(self, gx, gy):
         if self.is_inside(gx, gy):
             return self.grid[gx][gy]
         return None
 
+    def is_free(self, gx, gy):
+        return self.get_cell(gx, gy) == FREE
+
+    # ---------------- Connectivity -----------------
+    def component_roots(self, cell):
+        """Component ids touching cell (its own, or its free neighbours' if it is blocked)."""
+        if self._components is None:
+            self._components = ConnectivityIndex(self)
+        return self._components.roots_around(cell)
+
+    def connected(self, a, b):
+        """
+        O(1)-ish check whether a FREE path can exist between a and b.
+        Blocked endpoints (e.g. the block's own cell) count as touching
+        their free neighbours.
+        """
+        return not self.component_roots(a).isdisjoint(self.component_roots(b))
+
+    # ---------------- Planning overlays -----------------
+    def overlay(self, blocked=(), free=()):
+        """
+        Return a read-only view of this grid with extra BLOCKED / FREE cells.
+        The base grid is never modified, so many planning queries can share it.
+        """
+        return GridOverlay(self, blocked, free)
+
     # ---------------- Block integration -----------------
     def set_block(self, block):
         """Mark all grid cells occupied by a block as BLOCKED."""
@@ -60,12 +101,19 @@ class GridMap:
 
         return cells
 
+    # ---------------- Snapshots -----------------
+    def snapshot(self):
+        """Return an immutable ArenaSnapshot of the current occupancy."""
+        return ArenaSnapshot(self.width_cells, self.height_cells, self.grid, self.cell_size)
+
     # ---------------- Utility -----------------
     def clear(self):
         """Set all cells to FREE."""
         for x in range(self.width_cells):
             for y in range(self.height_cells):
                 self.grid[x][y] = FREE
+        self.version += 1
+        self._components = None
 
     def print_grid(self):
         """Debug: print a simple textual map."""
@@ -74,3 +122,206 @@ class GridMap:
             for x in range(self.width_cells):
                 row += "#" if self.grid[x][y] == BLOCKED else "."
             print(row)
+
+
+class ArenaSnapshot:
+    """
+    Immutable copy of a GridMap, safe to share between planning threads
+    and cheap to pickle for worker processes.
+    """
+
+    def __init__(self, width_cells, height_cells, grid, cell_size=1):
+        self.width_cells = width_cells
+        self.height_cells = height_cells
+        self.cell_size = cell_size
+        # Tuples, so nobody can write into a shared snapshot by accident
+        self.grid = tuple(tuple(column) for column in grid)
+        self.version = 0
+        self._components = None
+
+    def is_inside(self, gx, gy):
+        return 0 <= gx < self.width_cells and 0 <= gy < self.height_cells
+
+    def get_cell(self, gx, gy):
+        if self.is_inside(gx, gy):
+            return self.grid[gx][gy]
+        return None
+
+    def is_free(self, gx, gy):
+        return self.get_cell(gx, gy) == FREE
+
+    def component_roots(self, cell):
+        if self._components is None:
+            self._components = ConnectivityIndex(self)
+        return self._components.roots_around(cell)
+
+    def connected(self, a, b):
+        return not self.component_roots(a).isdisjoint(self.component_roots(b))
+
+    def overlay(self, blocked=(), free=()):
+        return GridOverlay(self, blocked, free)
+
+    def __getstate__(self):
+        # The index is rebuilt on demand; don't ship it to worker processes
+        state = self.__dict__.copy()
+        state["_components"] = None
+        return state
+
+
+class GridOverlay:
+    """
+    Sparse planning view layered over a GridMap (or another overlay).
+
+    blocked : cells reported as BLOCKED regardless of the base value
+    free    : cells reported as FREE regardless of the base value
+    Cells in both sets are FREE (same as stamping obstacles, then clearing the goal).
+    """
+
+    def __init__(self, base, blocked=(), free=()):
+        self.base = base
+        self.blocked = frozenset(blocked)
+        self.free = frozenset(free)
+
+        self.width_cells = base.width_cells
+        self.height_cells = base.height_cells
+        self.cell_size = base.cell_size
+
+        self._merged = None     # Component merges caused by the freed cells
+
+    # ---------------- Grid access -----------------
+    def is_inside(self, gx, gy):
+        return 0 <= gx < self.width_cells and 0 <= gy < self.height_cells
+
+    def get_cell(self, gx, gy):
+        if not self.is_inside(gx, gy):
+            return None
+        if (gx, gy) in self.free:
+            return FREE
+        if (gx, gy) in self.blocked:
+            return BLOCKED
+        return self.base.get_cell(gx, gy)
+
+    def is_free(self, gx, gy):
+        return self.get_cell(gx, gy) == FREE
+
+    # ---------------- Connectivity -----------------
+    # Extra blocked cells are ignored (the answer stays a safe "maybe"),
+    # extra free cells can join base components and are merged here.
+    def _merge_freed(self):
+        parent = {}
+
+        def find(t):
+            while parent.get(t, t) != t:
+                t = parent[t]
+            return t
+
+        for cell in self.free:
+            if self.base.get_cell(*cell) == FREE:
+                continue
+            tokens = set(self.base.component_roots(cell))
+            x, y = cell
+            for n in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]:
+                if n in self.free:
+                    tokens.add(("free", n))
+            root = find(("free", cell))
+            for t in tokens:
+                parent[find(t)] = root
+        return parent, find
+
+    def component_roots(self, cell):
+        if self._merged is None:
+            self._merged = self._merge_freed()
+        parent, find = self._merged
+
+        tokens = set(self.base.component_roots(cell))
+        if cell in self.free:
+            tokens.add(("free", cell))
+        else:
+            # A blocked endpoint also touches freed neighbours
+            x, y = cell
+            for n in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]:
+                if n in self.free:
+                    tokens.add(("free", n))
+        return {find(t) for t in tokens}
+
+    def connected(self, a, b):
+        return not self.component_roots(a).isdisjoint(self.component_roots(b))
+
+    def overlay(self, blocked=(), free=()):
+        """Stack another overlay on top of this one."""
+        return GridOverlay(self, blocked, free)
+
+    # ---------------- Utility -----------------
+    def print_grid(self):
+        """Debug: print a simple textual map."""
+        for y in range(self.height_cells):
+            row = ""
+            for x in range(self.width_cells):
+                row += "#" if self.get_cell(x, y) == BLOCKED else "."
+            print(row)
+
+
+class ConnectivityIndex:
+    """
+    Union-find over the FREE cells of a grid (4-connected).
+    Cells are flat ids gx * height + gy; blocked cells have no component.
+    """
+
+    def __init__(self, gridmap):
+        self.width = gridmap.width_cells
+        self.height = gridmap.height_cells
+        h = self.height
+
+        self.parent = list(range(self.width * h))
+        self.free = bytearray(self.width * h)
+
+        for gx in range(self.width):
+            for gy in range(h):
+                if gridmap.get_cell(gx, gy) == FREE:
+                    self.free[gx * h + gy] = 1
+
+        for gx in range(self.width):
+            for gy in range(h):
+                i = gx * h + gy
+                if not self.free[i]:
+                    continue
+                if gx + 1 < self.width and self.free[i + h]:
+                    self._union(i, i + h)
+                if gy + 1 < h and self.free[i + 1]:
+                    self._union(i, i + 1)
+
+    def _find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]   # path halving
+            i = parent[i]
+        return i
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self.parent[ra] = rb
+
+    def add_free(self, gx, gy):
+        """Incremental update for a cell that just became FREE."""
+        h = self.height
+        i = gx * h + gy
+        self.free[i] = 1
+        for nx, ny in [(gx + 1, gy), (gx - 1, gy), (gx, gy + 1), (gx, gy - 1)]:
+            if 0 <= nx < self.width and 0 <= ny < h and self.free[nx * h + ny]:
+                self._union(i, nx * h + ny)
+
+    def roots_around(self, cell):
+        gx, gy = cell
+        h = self.height
+        if not (0 <= gx < self.width and 0 <= gy < h):
+            return set()
+        i = gx * h + gy
+        if self.free[i]:
+            return {self._find(i)}
+
+        roots = set()
+        for nx, ny in [(gx + 1, gy), (gx - 1, gy), (gx, gy + 1), (gx, gy - 1)]:
+            if 0 <= nx < self.width and 0 <= ny < h and self.free[nx * h + ny]:
+                roots.add(self._find(nx * h + ny))
+        return roots
@@ -0,0 +1,223 @@
+from Environment.Command_Validator import HEADINGS
+from Environment.Grid_Map import FREE
+
+# Seconds per command on the robot, from the firmware (Aseba/actions.aesl):
+# distance / wheel speed at 10 ms per tick, plus the 0.5 s pause after every action.
+COMMAND_SECONDS = {
+    "F": 1.72,      # move_one_cell     885 at 250
+    "B": 1.72,      # move_cell_back    885 at 250
+    "HF": 0.96,     # move_half_cell_forward  200 at 150
+    "HB": 0.96,     # move_half_cell_back     200 at 150
+    "TL": 2.04,     # rotate_left       12200 at 150
+    "TR": 2.04,     # rotate_right
+    "AB": 2.0,      # PID alignment (1.5 s timeout) + approach
+    "PB": 4.08,     # two turns
+}
+
+_MIRROR = {"TL": "TR", "TR": "TL"}
+
+# ---- Routes ----
+# Canonical frame: the robot is at (0, 0) facing East (planner angle 0),
+# having just pushed the block onto (1, 0); the block's next push is South
+# (0, 1), so every route ends on the docking spot (1, -1) facing South.
+# Turns in the other direction use the mirrored commands (TL <-> TR).
+ROUTES = {
+    # The original triangle dance: out to the side, up, face the block
+    "dance": ["TL", "F", "TR", "F", "TR"],
+    # Back off a full cell first ("backwards"), then a wider dance
+    "back_dance": ["B", "TL", "F", "TR", "F", "F", "TR"],
+    # Two cells out behind the robot: drives round the cell beside it, (0, -1),
+    # which only the first turn sweeps
+    "wide_loop": ["B", "TL", "F", "F", "TR", "F", "F", "TR", "F"],
+    # Round the far side of the block, through the cell it goes to next
+    "far_loop": ["TR", "F", "TL", "F", "F", "TL", "F", "F", "TL", "F", "TL"],
+}
+BLOCK = (1, 0)
+DOCK = (1, -1)
+DOCK_ANGLE = 90
+
+NONE = 0xFF         # Table entry: no maneuver fits
+
+
+def footprint(commands):
+    """
+    Cells (canonical frame) that must be free for commands, plus the final pose.
+    The robot's own cell (0, 0) is never listed.
+
+    Occupancy model: the robot fills the cells it drives through; an in-place
+    turn also sweeps its front corner through the diagonal cell between the
+    old and new heading. There are no half moves (HB/HF): a turn between them
+    would leave the robot off the cell centres.
+    """
+    pos, angle = (0, 0), 0
+    cells = set()
+    for cmd in commands:
+        dx, dy = HEADINGS[angle]
+        if cmd == "F":
+            pos = (pos[0] + dx, pos[1] + dy)
+            cells.add(pos)
+        elif cmd == "B":
+            pos = (pos[0] - dx, pos[1] - dy)
+            cells.add(pos)
+        elif cmd in ("TL", "TR"):
+            new_angle = (angle + (90 if cmd == "TR" else -90)) % 360
+            ndx, ndy = HEADINGS[new_angle]
+            cells.add((pos[0] + dx + ndx, pos[1] + dy + ndy))
+            angle = new_angle
+        else:
+            raise ValueError(f"unsupported maneuver command {cmd!r}")
+    cells.discard((0, 0))
+    return frozenset(cells), pos, angle
+
+
+class Maneuver:
+    """One way of getting from behind the block to its new docking spot."""
+
+    def __init__(self, name, commands):
+        self.name = name
+        self.commands = list(commands)             # Canonical frame (see ROUTES)
+        self.mirrored = [_MIRROR.get(cmd, cmd) for cmd in self.commands]
+        self.cells, end, end_angle = footprint(self.commands)
+        if BLOCK in self.cells or (end, end_angle) != (DOCK, DOCK_ANGLE):
+            raise ValueError(f"maneuver {name} does not dock behind the block")
+        self.seconds = sum(COMMAND_SECONDS[cmd] for cmd in self.commands)
+
+    def __repr__(self):
+        return f"Maneuver({self.name}, {self.seconds:.2f}s)"
+
+
+class ManeuverLibrary:
+    """
+    Precomputed re-docking maneuvers for the turns of a block path.
+
+    Every footprint is a subset of a few canonical cells, so the obstacles
+    around a turn reduce to a bitmask over those cells; table[mask] holds
+    the index of the fastest maneuver whose footprint avoids all of them
+    (NONE if there is none), built once for every mask. choose() is then
+    at most one grid lookup per cell and one table lookup.
+    """
+
+    def __init__(self, maneuvers=None):
+        if maneuvers is None:
+            maneuvers = []
+            maneuvers = [Maneuver(name, commands) for name, commands in ROUTES.items()]
+        self.maneuvers = sorted(maneuvers, key=lambda m: m.seconds)
+
+        self.cells = sorted(set().union(*(m.cells for m in self.maneuvers)))
+        bit = {cell: 1 << i for i, cell in enumerate(self.cells)}
+        masks = [sum(bit[cell] for cell in m.cells) for m in self.maneuvers]
+
+        # Slowest first, so a faster maneuver overwrites every mask it also fits:
+        # only the submasks of each footprint's complement are visited
+        full = (1 << len(self.cells)) - 1
+        self.table = bytearray([NONE]) * (full + 1)
+        for i in reversed(range(len(masks))):
+            free = full & ~masks[i]
+            blocked = free
+            while True:
+                self.table[blocked] = i
+                if not blocked:
+                    break
+                blocked = (blocked - 1) & free
+
+        # Per turn direction: the cells as (dx, dy, bit) offsets from the robot's
+        # cell, the fastest maneuver's first (if those are free, it wins anyway)
+        order = sorted(range(len(self.cells)), key=lambda i: self.cells[i] not in self.maneuvers[0].cells)
+        self._fastest = len(self.maneuvers[0].cells)
+        self._offsets = {}
+        for vec_in in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            for vec_out in ((vec_in[1], vec_in[0]), (-vec_in[1], -vec_in[0])):
+                offsets = []
+                for i in order:
+                    a, b = self.cells[i]
+                    offsets.append((a * vec_in[0] + b * vec_out[0], a * vec_in[1] + b * vec_out[1], 1 << i))
+                self._offsets[vec_in, vec_out] = offsets
+        self._reach = max(max(abs(dx), abs(dy)) for offsets in self._offsets.values() for dx, dy, _ in offsets)
+        self._flat_offsets = {}     # height -> {(vec_in, vec_out): [(flat delta, bit)]}
+
+    def blocked_mask(self, grid, block, vec_in, vec_out):
+        """
+        Bitmask of the library cells that aren't free around a turn of block
+        (vec_in -> vec_out); None if that isn't a 90 degree turn.
+        Cells only the slower maneuvers need are skipped if the fastest fits.
+        """
+        offsets = self._offsets.get((vec_in, vec_out))
+        if offsets is None:
+            return None
+        px, py = block[0] - vec_in[0], block[1] - vec_in[1]
+        w, h = grid.width_cells, grid.height_cells
+        mask = 0
+        for n, (dx, dy, bit) in enumerate(offsets):
+            if n == self._fastest and not mask:
+                break
+            x, y = px + dx, py + dy
+            if not (0 <= x < w and 0 <= y < h) or grid.get_cell(x, y) != FREE:
+                mask |= bit
+        return mask
+
+    def passable_mask(self, passable, width, height, block, vec_in, vec_out):
+        """blocked_mask() on a flat passable array (x * height + y, 1 = free), as in Flat_Search."""
+        offsets = self._offsets.get((vec_in, vec_out))
+        if offsets is None:
+            return None
+        px, py = block[0] - vec_in[0], block[1] - vec_in[1]
+        mask = 0
+
+        reach = self._reach
+        if reach <= px < width - reach and reach <= py < height - reach:
+            # Away from the border: plain flat offsets, no bounds checks
+            flat = self._flat_offsets.get(height)
+            if flat is None:
+                flat = self._flat_offsets[height] = {
+                    key: [(dx * height + dy, bit) for dx, dy, bit in cells] for key, cells in self._offsets.items()
+                }
+            p = px * height + py
+            for n, (delta, bit) in enumerate(flat[vec_in, vec_out]):
+                if n == self._fastest and not mask:
+                    break
+                if not passable[p + delta]:
+                    mask |= bit
+            return mask
+
+        for n, (dx, dy, bit) in enumerate(offsets):
+            if n == self._fastest and not mask:
+                break
+            x, y = px + dx, py + dy
+            if not (0 <= x < width and 0 <= y < height) or not passable[x * height + y]:
+                mask |= bit
+        return mask
+
+    def choose(self, grid, block, vec_in, vec_out):
+        """
+        Fastest collision-free maneuver for the robot behind block (pushed
+        along vec_in) to dock for the push along vec_out.
+        Returns (maneuver, commands) or None if no maneuver fits.
+        """
+        mask = self.blocked_mask(grid, block, vec_in, vec_out)
+        if mask is None or self.table[mask] == NONE:
+            return None
+        maneuver = self.maneuvers[self.table[mask]]
+        # Canonical vec_out is a clockwise turn of vec_in (cross > 0, Y+ down)
+        cross = vec_in[0] * vec_out[1] - vec_in[1] * vec_out[0]
+        return maneuver, (maneuver.commands if cross > 0 else maneuver.mirrored)
+
+    def feasible(self, grid, block, vec_in, vec_out):
+        """True if some maneuver turns block from vec_in to vec_out (reversing never is)."""
+        mask = self.blocked_mask(grid, block, vec_in, vec_out)
+        return mask is not None and self.table[mask] != NONE
+
+    def feasible_flat(self, passable, width, height, block, vec_in, vec_out):
+        """feasible() on a flat passable array."""
+        mask = self.passable_mask(passable, width, height, block, vec_in, vec_out)
+        return mask is not None and self.table[mask] != NONE
+
+
+_default = None
+
+
+def default_library():
+    """The shared library of the built-in routes (built on first use)."""
+    global _default
+    if _default is None:
+        _default = ManeuverLibrary()
+    return _default
@@ -0,0 +1,51 @@
+from Environment.Grid_Map import FREE
+
+# 4-connected push directions: East, West, South, North
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+def can_push(grid, cell, direction):
+    """
+    True if a block at cell can be pushed one step in direction:
+    the target cell must be free and the robot needs a free cell behind the block.
+    """
+    x, y = cell
+    dx, dy = direction
+    return grid.get_cell(x + dx, y + dy) == FREE and grid.get_cell(x - dx, y - dy) == FREE
+
+
+def is_pushable(grid, cell):
+    """False if the block is wedged (corner / between obstacles) and can never move."""
+    return any(can_push(grid, cell, d) for d in DIRECTIONS)
+
+
+def can_receive(grid, goal):
+    """True if some push can end with the block on goal (block comes from goal-d, robot from goal-2d)."""
+    gx, gy = goal
+    for dx, dy in DIRECTIONS:
+        if grid.get_cell(gx - dx, gy - dy) == FREE and grid.get_cell(gx - 2 * dx, gy - 2 * dy) == FREE:
+            return True
+    return False
+
+
+def check_mission_feasible(grid, robot_pos, block_start, block_goal):
+    """
+    Cheap necessary conditions for a block move, checked before any search.
+    Returns None if the mission may be possible, else the reason it is not.
+    """
+    if block_start == block_goal:
+        return None
+
+    if hasattr(grid, "connected"):
+        if not grid.connected(block_start, block_goal):
+            return "goal not connected to block"
+        if not grid.connected(robot_pos, block_start):
+            return "robot cannot reach the block"
+
+    if not is_pushable(grid, block_start):
+        return "block cannot be pushed from its start cell"
+
+    if not can_receive(grid, block_goal):
+        return "no push can end on the goal cell"
+
+    return None
@@ -0,0 +1,102 @@
+import json
+import os
+
+from Environment.Grid_Map import GridMap, BLOCKED
+from Environment.Block_Manager import Block, BlockManager
+
+try:
+    import yaml  # Optional: only needed for .yaml / .yml scenarios
+except ImportError:
+    yaml = None
+
+
+class Scenario:
+    """
+    Arena, blocks and structure plan loaded from a JSON or YAML file:
+
+        {
+          "name":   "default",
+          "arena":  {"width": 20, "height": 15, "cell_size": 50, "obstacles": [[3, 3]]},
+          "robot":  {"start": [0, 0], "angle": 0},
+          "blocks": {"cube1": [0, 4]},
+          "plan":   {"cube1": [0, 5]}
+        }
+
+    "plan" maps block name -> goal cell and is executed in file order
+    (a list of [name, [x, y]] pairs works too).
+    """
+
+    def __init__(self, name, width, height, cell_size=1, obstacles=(), robot_start=(0, 0),
+                 robot_angle=0, blocks=None, plan=()):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.obstacles = [tuple(c) for c in obstacles]
+        self.robot_start = tuple(robot_start)
+        self.robot_angle = robot_angle
+        self.blocks = {n: tuple(c) for n, c in (blocks or {}).items()}
+        self.plan = [(n, tuple(c)) for n, c in plan]
+
+        for block_name, _ in self.plan:
+            if block_name not in self.blocks:
+                raise ValueError(f"Scenario {name}: plan moves unknown block {block_name!r}")
+
+    # ---------------- Loading -----------------
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            if path.endswith((".yaml", ".yml")):
+                if yaml is None:
+                    raise ImportError("PyYAML is required for YAML scenarios (pip install pyyaml)")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+
+        default_name = os.path.splitext(os.path.basename(path))[0]
+        return cls.from_dict(data, default_name)
+
+    @classmethod
+    def from_dict(cls, data, default_name="scenario"):
+        arena = data["arena"]
+        robot = data.get("robot", {})
+        plan = data.get("plan", {})
+        if isinstance(plan, dict):
+            plan = list(plan.items())
+
+        return cls(
+            name=data.get("name", default_name),
+            width=arena["width"],
+            height=arena["height"],
+            cell_size=arena.get("cell_size", 1),
+            obstacles=arena.get("obstacles", ()),
+            robot_start=robot.get("start", (0, 0)),
+            robot_angle=robot.get("angle", 0),
+            blocks=data.get("blocks", {}),
+            plan=plan,
+        )
+
+    def to_dict(self):
+        """Inverse of from_dict (JSON friendly)."""
+        return {
+            "name": self.name,
+            "arena": {"width": self.width, "height": self.height, "cell_size": self.cell_size,
+                      "obstacles": [list(c) for c in self.obstacles]},
+            "robot": {"start": list(self.robot_start), "angle": self.robot_angle},
+            "blocks": {n: list(c) for n, c in self.blocks.items()},
+            "plan": [[n, list(c)] for n, c in self.plan],
+        }
+
+    # ---------------- World construction -----------------
+    def build_grid(self):
+        """Static arena only; blocks live in the BlockManager."""
+        grid = GridMap(width_cells=self.width, height_cells=self.height, cell_size=self.cell_size)
+        for gx, gy in self.obstacles:
+            grid.set_cell(gx, gy, BLOCKED)
+        return grid
+
+    def build_block_manager(self):
+        block_manager = BlockManager()
+        for block_name, (gx, gy) in self.blocks.items():
+            block_manager.add_block(block_name, Block(gx, gy, 1, 1))
+        return block_manager
@@ -54,3 +54,22 @@ def path_to_commands(path, start_angle=0):
         queue.add("F")
 
     return queue
+
+
+def planning_overlay(grid, block_manager, active_block_name, goal_pos):
+    """
+    Build a planning view for moving one block without touching the grid.
+    All other blocks become obstacles, the goal cell is forced FREE.
+    Every block fills one cell, at its (rounded down) position, as in the
+    simulator and validate_commands() (get_block_cells() would inflate a
+    block centred on a cell to its four neighbours).
+    Returns: GridOverlay over grid
+    """
+    blocked = []
+    for name, block in block_manager.blocks.items():
+        # Skip the block being moved (so robot can navigate around/behind it)
+        if name == active_block_name:
+            continue
+        blocked.append((int(block.x), int(block.y)))
+
+    return grid.overlay(blocked=blocked, free=[goal_pos])
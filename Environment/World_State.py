@@ -0,0 +1,378 @@
+import atexit
+import multiprocessing
+import os
+import struct
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+from Environment.Block_Manager import Block, BlockManager
+from Environment.Grid_Map import FREE, ArenaSnapshot, ConnectivityIndex, GridOverlay
+
+# ---- Segment layout ----
+# HEADER, then the occupancy grid (int8 per cell, flat id gx * height + gy,
+# the order Flat_Search uses), then max_blocks fixed-size BLOCK records.
+#
+# Seqlock: seq is odd while the (single) writer is inside write(); readers
+# copy what they need and retry if seq was odd or changed meanwhile.
+# grid_version only moves when cells change, so robot / block updates don't
+# invalidate the planners' per-arena caches.
+#
+# HEADER: magic, seq, grid_version, width, height, cell_size, max_blocks,
+#         n_blocks, robot x, robot y, robot angle (planner convention), creator pid
+MAGIC = b"THYWLD1\0"
+HEADER = struct.Struct("<8sQQIIdIIiiiI")
+HEADER_SIZE = 64
+SEQ_OFFSET = 8
+GRID_VERSION_OFFSET = 16
+BLOCKS_OFFSET = 44          # n_blocks
+ROBOT_OFFSET = 48
+CREATOR_OFFSET = 60
+BLOCK = struct.Struct("<24s5d")     # name (UTF-8, zero padded), x, y, width, height, angle
+NAME_BYTES = 24
+
+_U64 = struct.Struct("<Q")
+_U32 = struct.Struct("<I")
+_ROBOT = struct.Struct("<iii")
+
+_attached = {}      # name -> SharedWorldState attached by this process (see attach())
+
+
+def _open_segment(name):
+    """Attach to an existing segment without handing it to this process's resource tracker."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)     # Python 3.13+
+    except TypeError:
+        pass
+    # Before 3.13 attaching registers the segment too, and the tracker would
+    # unlink it when this process exits: take it back out. Unless this process
+    # shares the creator's tracker (the creator itself, or one of its
+    # multiprocessing workers): there the entry is the creator's, and
+    # registering again was a no-op.
+    shm = shared_memory.SharedMemory(name=name)
+    creator = _U32.unpack_from(shm.buf, CREATOR_OFFSET)[0]
+    parent = multiprocessing.parent_process()
+    if creator != os.getpid() and (parent is None or parent.pid != creator):
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedWorldState:
+    """
+    Arena, blocks and robot pose in one multiprocessing.shared_memory segment.
+
+    The process that create()s it is the only writer (the control loop);
+    planner workers, the simulator and a renderer attach() by name and read
+    it in place: grid_view() is a GridMap-like view straight on the shared
+    cells, read() copies robot pose + block table under the seqlock.
+    Pickling a state (or a view) only ships its name; the receiving process
+    attaches read-only.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.name = shm.name
+        self.owner = owner              # Only the owner may write (and unlink)
+
+        magic, _, _, width, height, cell_size, max_blocks, _, _, _, _, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            shm.close()
+            raise ValueError(f"shared memory {shm.name} is not a world state")
+        self.width_cells = width
+        self.height_cells = height
+        self.cell_size = cell_size
+        self.max_blocks = max_blocks
+
+        self._cells = shm.buf[HEADER_SIZE:HEADER_SIZE + width * height].cast("b")
+        self._table = HEADER_SIZE + (width * height + 7) // 8 * 8
+        self._depth = 0                 # Nesting of write() sections
+        self._grid_dirty = False
+        self._index = {}                # Owner: block name -> table slot
+        self._view = None
+
+    # ---------------- Lifecycle -----------------
+    @classmethod
+    def create(cls, width_cells, height_cells, cell_size=1, max_blocks=32, name=None):
+        """New, empty (all FREE) world; the calling process becomes its writer."""
+        grid_bytes = (width_cells * height_cells + 7) // 8 * 8
+        size = HEADER_SIZE + grid_bytes + BLOCK.size * max_blocks
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, 0, 0, width_cells, height_cells, cell_size, max_blocks, 0, 0, 0, 0,
+                         os.getpid())
+        return cls(shm, owner=True)
+
+    @classmethod
+    def from_world(cls, grid, block_manager=None, robot_pos=(0, 0), robot_angle=0, max_blocks=None, name=None):
+        """create() + load a GridMap (or snapshot / overlay), a BlockManager and the robot pose."""
+        blocks = block_manager.blocks if block_manager is not None else {}
+        if max_blocks is None:
+            max_blocks = max(32, len(blocks))
+        state = cls.create(grid.width_cells, grid.height_cells, grid.cell_size, max_blocks, name)
+        with state.write():
+            state.load_grid(grid)
+            state.set_blocks(block_manager)
+            state.set_robot(robot_pos, robot_angle)
+        return state
+
+    @classmethod
+    def attach(cls, name):
+        """Read-only handle on an existing world."""
+        return cls(_open_segment(name), owner=False)
+
+    def close(self):
+        """Detach this process (views of it stop working)."""
+        if self.shm is None:
+            return
+        self._cells.release()
+        self.shm.close()
+        self.shm = None
+        if _attached.get(self.name) is self:
+            del _attached[self.name]
+
+    def unlink(self):
+        """Owner only: remove the segment's name; it is freed once every process has detached."""
+        self._check_owner()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self.owner:
+            self.unlink()
+        self.close()
+
+    def __reduce__(self):
+        return attach, (self.name,)
+
+    # ---------------- Writer -----------------
+    def _check_owner(self):
+        if not self.owner:
+            raise RuntimeError(f"world state {self.name} is read-only here: only its creator writes")
+
+    @contextmanager
+    def write(self):
+        """Seqlock write section: readers never see a half-done update. Sections nest."""
+        self._check_owner()
+        buf = self.shm.buf
+        if self._depth == 0:
+            seq = _U64.unpack_from(buf, SEQ_OFFSET)[0]
+            _U64.pack_into(buf, SEQ_OFFSET, seq + 1)       # Odd: write in progress
+        self._depth += 1
+        try:
+            yield self
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                if self._grid_dirty:
+                    # Cells first, then the version: a reader that sees the new
+                    # version also sees the new cells
+                    version = _U64.unpack_from(buf, GRID_VERSION_OFFSET)[0]
+                    _U64.pack_into(buf, GRID_VERSION_OFFSET, version + 1)
+                    self._grid_dirty = False
+                seq = _U64.unpack_from(buf, SEQ_OFFSET)[0]
+                _U64.pack_into(buf, SEQ_OFFSET, seq + 1)   # Even: consistent again
+
+    def set_cell(self, gx, gy, value):
+        if 0 <= gx < self.width_cells and 0 <= gy < self.height_cells:
+            with self.write():
+                i = gx * self.height_cells + gy
+                if self._cells[i] != value:
+                    self._cells[i] = value
+                    self._grid_dirty = True
+
+    def load_grid(self, grid):
+        """Copy every cell of grid (same size) into the shared arena."""
+        if (grid.width_cells, grid.height_cells) != (self.width_cells, self.height_cells):
+            raise ValueError("grid size doesn't match the shared arena")
+        cells = getattr(grid, "grid", None)
+        if cells is not None:
+            # grid[x][y] columns concatenate to exactly the flat id order
+            flat = bytearray()
+            for column in cells:
+                flat.extend(value & 0xFF for value in column)
+        else:
+            flat = bytearray(grid.get_cell(x, y) & 0xFF
+                             for x in range(self.width_cells) for y in range(self.height_cells))
+        with self.write():
+            self._cells.cast("B")[:] = flat
+            self._grid_dirty = True
+
+    def set_robot(self, pos, angle):
+        with self.write():
+            _ROBOT.pack_into(self.shm.buf, ROBOT_OFFSET, pos[0], pos[1], angle % 360)
+
+    def set_blocks(self, block_manager):
+        """Replace the block table with block_manager's blocks (in its order)."""
+        blocks = block_manager.blocks if block_manager is not None else {}
+        if len(blocks) > self.max_blocks:
+            raise ValueError(f"{len(blocks)} blocks don't fit the table of {self.max_blocks}")
+        with self.write():
+            self._index = {}
+            for slot, (name, block) in enumerate(blocks.items()):
+                self._write_block(slot, name, block.x, block.y, block.width, block.height, block.angle)
+            _U32.pack_into(self.shm.buf, BLOCKS_OFFSET, len(blocks))
+
+    def move_block(self, name, x, y):
+        """Update one block's position (it keeps its size and angle)."""
+        slot = self._index.get(name)
+        if slot is None:
+            raise KeyError(f"Unknown block: {name}")
+        with self.write():
+            offset = self._table + slot * BLOCK.size
+            raw, _, _, width, height, angle = BLOCK.unpack_from(self.shm.buf, offset)
+            BLOCK.pack_into(self.shm.buf, offset, raw, x, y, width, height, angle)
+
+    def publish(self, robot_pos, robot_angle, blocks):
+        """One control-loop update: robot pose + {block name: (x, y)} as a single write."""
+        with self.write():
+            self.set_robot(robot_pos, robot_angle)
+            for name, (x, y) in blocks.items():
+                self.move_block(name, x, y)
+
+    def _write_block(self, slot, name, x, y, width, height, angle):
+        raw = name.encode()
+        if len(raw) > NAME_BYTES:
+            raise ValueError(f"block name {name!r} is longer than {NAME_BYTES} bytes")
+        BLOCK.pack_into(self.shm.buf, self._table + slot * BLOCK.size, raw, x, y, width, height, angle)
+        self._index[name] = slot
+
+    # ---------------- Readers -----------------
+    @property
+    def seq(self):
+        return _U64.unpack_from(self.shm.buf, SEQ_OFFSET)[0]
+
+    @property
+    def grid_version(self):
+        return _U64.unpack_from(self.shm.buf, GRID_VERSION_OFFSET)[0]
+
+    def _read_begin(self):
+        """Wait for the writer to leave its section; returns the seq to check against."""
+        while True:
+            seq = self.seq
+            if not seq & 1:
+                return seq
+            time.sleep(0)
+
+    def read(self):
+        """Consistent copy of ((x, y), planner angle, {block name: Block}) from one instant."""
+        buf = self.shm.buf
+        while True:
+            seq = self._read_begin()
+            x, y, angle = _ROBOT.unpack_from(buf, ROBOT_OFFSET)
+            count = min(_U32.unpack_from(buf, BLOCKS_OFFSET)[0], self.max_blocks)
+            records = [BLOCK.unpack_from(buf, self._table + slot * BLOCK.size) for slot in range(count)]
+            if self.seq == seq:
+                break
+        blocks = {}
+        for raw, bx, by, width, height, block_angle in records:
+            blocks[raw.rstrip(b"\0").decode()] = Block(bx, by, width, height, block_angle)
+        return (x, y), angle, blocks
+
+    def block_manager(self):
+        """BlockManager with a copy of the current block table."""
+        manager = BlockManager()
+        for name, block in self.read()[2].items():
+            manager.add_block(name, block)
+        return manager
+
+    def grid_view(self):
+        """The shared arena as a read-only grid (one view per handle)."""
+        if self._view is None:
+            self._view = SharedGridView(self)
+        return self._view
+
+
+def attach(name):
+    """Read-only SharedWorldState for name, attached once per process."""
+    state = _attached.get(name)
+    if state is None:
+        state = _attached[name] = SharedWorldState.attach(name)
+    return state
+
+
+@atexit.register
+def _close_attached():
+    # A SharedMemory can't be closed while the cell view is exported, so
+    # handles left open must be closed before the interpreter collects them
+    for state in list(_attached.values()):
+        state.close()
+
+
+def _view_of(name):
+    return attach(name).grid_view()
+
+
+class SharedGridView:
+    """
+    Read-only GridMap interface straight on a SharedWorldState's cells:
+    nothing is copied to plan against it, in this or any other process.
+
+    version follows the writer's grid_version, so the planners' per-arena
+    caches (connectivity, dead squares, flat search arrays) refresh
+    whenever the cells change. Cells can change *during* a search; wrap a
+    query in consistent() to repeat it until no grid write overlapped it.
+    """
+
+    def __init__(self, state):
+        self.state = state
+        self.width_cells = state.width_cells
+        self.height_cells = state.height_cells
+        self.cell_size = state.cell_size
+        self.flat_cells = state._cells          # int8, flat id order
+        self._components = None
+        self._components_version = None
+
+    @property
+    def version(self):
+        return self.state.grid_version
+
+    # ---------------- Grid access -----------------
+    def is_inside(self, gx, gy):
+        return 0 <= gx < self.width_cells and 0 <= gy < self.height_cells
+
+    def get_cell(self, gx, gy):
+        if self.is_inside(gx, gy):
+            return self.flat_cells[gx * self.height_cells + gy]
+        return None
+
+    def is_free(self, gx, gy):
+        return self.get_cell(gx, gy) == FREE
+
+    # ---------------- Connectivity -----------------
+    def component_roots(self, cell):
+        version = self.version
+        if self._components is None or self._components_version != version:
+            self._components = ConnectivityIndex(self)
+            self._components_version = version
+        return self._components.roots_around(cell)
+
+    def connected(self, a, b):
+        return not self.component_roots(a).isdisjoint(self.component_roots(b))
+
+    def overlay(self, blocked=(), free=()):
+        return GridOverlay(self, blocked, free)
+
+    # ---------------- Consistency -----------------
+    def consistent(self, fn):
+        """
+        Run fn(self) until no grid write overlapped it (seqlock read side);
+        returns its result. Robot / block updates don't cause a retry.
+        """
+        state = self.state
+        while True:
+            state._read_begin()
+            version = state.grid_version
+            result = fn(self)
+            if not state.seq & 1 and state.grid_version == version:
+                return result
+
+    def copy(self):
+        """Private ArenaSnapshot of the current cells (for code that must not see changes at all)."""
+        h = self.height_cells
+        return self.consistent(lambda view: ArenaSnapshot(
+            self.width_cells, h, [self.flat_cells[x * h:(x + 1) * h].tolist() for x in range(self.width_cells)],
+            self.cell_size))
+
+    def __reduce__(self):
+        return _view_of, (self.state.name,)
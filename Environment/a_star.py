@@ -1,5 +1,38 @@
 import heapq
 import math
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class SearchBudgetExceeded(Exception):
+    """Raised by a search that ran out of its SearchBudget before finding the goal."""
+
+
+class SearchBudget:
+    """
+    Wall-clock and/or expansion limit for one or more searches.
+    Searches call charge() once per expanded node; cancel() stops them at the
+    next expansion (safe to call from another thread).
+    """
+
+    def __init__(self, seconds=None, expansions=None):
+        self.deadline = time.perf_counter() + seconds if seconds is not None else None
+        self.expansions_left = expansions
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def charge(self):
+        if self.cancelled:
+            raise SearchBudgetExceeded("search cancelled")
+        if self.expansions_left is not None:
+            self.expansions_left -= 1
+            if self.expansions_left < 0:
+                raise SearchBudgetExceeded("expansion budget exhausted")
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchBudgetExceeded("time budget exhausted")
 
 
 def heuristic(a, b):
@@ -8,11 +41,125 @@ def heuristic(a, b):
     return abs(x1 - x2) + abs(y1 - y2)
 
 
+class SearchStats:
+    """
+    Profiling counters filled in by a search (astar, get_weighted_block_path,
+    FlatGridSearch). One object can be passed to several searches (e.g. the
+    rounds of an anytime search); the counters add up.
+
+    searches  : searches run with this object
+    expanded  : nodes expanded (neighbours generated)
+    pops      : open-set pops (including stale entries that were skipped)
+    pushes    : open-set pushes
+    reopened  : pushes of a node that had already been expanded
+    peak_open : largest open-set size seen
+    time_s    : wall time spent inside timer()
+
+    Optional hooks: on_pop(cell), on_expand(cell, g), on_push(cell, g).
+    """
+
+    def __init__(self, phase=None, on_expand=None, on_push=None, on_pop=None):
+        self.phase = phase
+        self.on_expand = on_expand
+        self.on_push = on_push
+        self.on_pop = on_pop
+
+        self.searches = 0
+        self.expanded = 0
+        self.pops = 0
+        self.pushes = 0
+        self.reopened = 0
+        self.peak_open = 0
+        self.time_s = 0.0
+        self._closed = set()
+
+    # ---------------- Called by the searches -----------------
+    def begin(self):
+        self.searches += 1
+        self._closed = set()
+
+    def popped(self, cell):
+        self.pops += 1
+        if self.on_pop is not None:
+            self.on_pop(cell)
+
+    def expanding(self, cell, g):
+        self.expanded += 1
+        self._closed.add(cell)
+        if self.on_expand is not None:
+            self.on_expand(cell, g)
+
+    def pushed(self, cell, g, open_size):
+        self.pushes += 1
+        if cell in self._closed:
+            self.reopened += 1
+        if open_size > self.peak_open:
+            self.peak_open = open_size
+        if self.on_push is not None:
+            self.on_push(cell, g)
+
+    # ---------------- Reporting -----------------
+    @contextmanager
+    def timer(self):
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.time_s += time.perf_counter() - t0
+            self._closed = set()    # Only needed while a search runs
+
+    def __getstate__(self):
+        # Results travel back from worker processes: skip the scratch set and the hooks
+        state = dict(self.__dict__, _closed=set())
+        state.update(on_expand=None, on_push=None, on_pop=None)
+        return state
+
+    def as_dict(self):
+        return {
+            "phase": self.phase,
+            "searches": self.searches,
+            "expanded": self.expanded,
+            "pops": self.pops,
+            "pushes": self.pushes,
+            "reopened": self.reopened,
+            "peak_open": self.peak_open,
+            "time_ms": self.time_s * 1000,
+        }
+
+    def __str__(self):
+        name = self.phase or "search"
+        if not self.searches:
+            return f"{name}: {self.time_s * 1000:.2f} ms"
+        return (f"{name}: {self.expanded} expanded, {self.pushes} pushed, {self.reopened} reopened, "
+                f"peak open {self.peak_open}, {self.time_s * 1000:.2f} ms")
+
+
+def path_cost(path, turn_penalty=2.5):
+    """Cost of a 4-connected path as the searches count it: 1 per move + turn_penalty per turn."""
+    cost = 0
+    last_dir = None
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        d = (x2 - x1, y2 - y1)
+        cost += 1
+        if last_dir is not None and d != last_dir:
+            cost += turn_penalty
+        last_dir = d
+    return cost
+
+
 # Added turn_penalty parameter (default 0 acts like normal A*)
-def astar(gridmap, start, goal, turn_penalty=2.5):
+# gridmap can be a GridMap or a GridOverlay (anything with get_cell)
+# weight > 1 gives weighted A*: faster, path cost at most weight * optimal
+# budget: optional SearchBudget; raises SearchBudgetExceeded when it runs out
+# stats: optional SearchStats (counters + profiler hooks)
+def astar(gridmap, start, goal, turn_penalty=2.5, weight=1.0, budget=None, stats=None):
     width = gridmap.width_cells
     height = gridmap.height_cells
 
+    # Unreachable goal: answer from the connectivity index instead of a full search
+    if hasattr(gridmap, "connected") and not gridmap.connected(start, goal):
+        return []
+
     # Open set: priority queue with (f_score, count, node)
     open_set = []
     heapq.heappush(open_set, (0, 0, start))
@@ -22,10 +169,18 @@ def astar(gridmap, start, goal, turn_penalty=2.5):
     f_score = {start: heuristic(start, goal)}
 
     count = 0  # tie-breaker for heapq
+    if stats is not None:
+        stats.begin()
+        stats.pushed(start, 0, 1)
 
     while open_set:
         current = heapq.heappop(open_set)[2]
 
+        if stats is not None:
+            stats.popped(current)
+        if budget is not None:
+            budget.charge()
+
         if current == goal:
             path = [current]
             while current in came_from:
@@ -35,6 +190,8 @@ def astar(gridmap, start, goal, turn_penalty=2.5):
             return path
 
         cx, cy = current
+        if stats is not None:
+            stats.expanding(current, g_score[current])
 
         # Calculate previous direction if we aren't at the start
         prev_dx, prev_dy = None, None
@@ -49,7 +206,7 @@ def astar(gridmap, start, goal, turn_penalty=2.5):
         for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
             nx, ny = cx + dx, cy + dy
             if 0 <= nx < width and 0 <= ny < height:
-                if gridmap.grid[nx][ny] == 0:  # FREE
+                if gridmap.get_cell(nx, ny) == 0:  # FREE
                     neighbors.append(((nx, ny), dx, dy))
 
         for (neighbor, dx, dy) in neighbors:
@@ -68,8 +225,35 @@ def astar(gridmap, start, goal, turn_penalty=2.5):
             if neighbor not in g_score or tentative_g < g_score[neighbor]:
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g
-                f_score[neighbor] = tentative_g + heuristic(neighbor, goal)
+                f_score[neighbor] = tentative_g + weight * heuristic(neighbor, goal)
                 count += 1
                 heapq.heappush(open_set, (f_score[neighbor], count, neighbor))
+                if stats is not None:
+                    stats.pushed(neighbor, tentative_g, len(open_set))
+
+    return []
+
+
+def distance_field(gridmap, goal):
+    """
+    BFS distances (in moves) from every reachable FREE cell to goal.
+    A lower bound for any search on this grid or on an overlay that only
+    blocks extra cells, so it can be reused as an A* heuristic across queries.
+    """
+    width = gridmap.width_cells
+    height = gridmap.height_cells
+
+    dist = {goal: 0}
+    frontier = deque([goal])
+
+    while frontier:
+        cx, cy = frontier.popleft()
+        d = dist[(cx, cy)] + 1
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = cx + dx, cy + dy
+            if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in dist:
+                if gridmap.get_cell(nx, ny) == 0:  # FREE
+                    dist[(nx, ny)] = d
+                    frontier.append((nx, ny))
 
-    return []
\ No newline at end of file
+    return dist
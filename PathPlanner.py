@@ -1,11 +1,126 @@
 import math
 import heapq
-from Environment.a_star import astar  # Uses your existing A* for basic pathfinding
+from functools import partial
+from Environment.a_star import astar, path_cost, SearchStats  # Uses your existing A* for basic pathfinding
+from Environment.Anytime_Search import AnytimeSearch, DEFAULT_WEIGHTS
+from Environment.Flat_Search import borrow_searcher, flat_astar
+from Environment.Push_Rules import check_mission_feasible
+from Environment.Deadlocks import live_squares, make_pruner
+from Environment.Maneuvers import default_library
+
+
+def step_robot_state(pos, angle, command):
+    """Pure odometry step: return (pos, angle) after a single command."""
+    if command == "F":
+        # Move forward one cell in the current orientation
+        if angle == 0:   # East
+            return (pos[0] + 1, pos[1]), angle
+        if angle == 180:  # West
+            return (pos[0] - 1, pos[1]), angle
+        if angle == 90:   # South
+            return (pos[0], pos[1] + 1), angle
+        if angle == 270:  # North
+            return (pos[0], pos[1] - 1), angle
+
+    elif command == "B":
+        # Back up one cell, keeping the orientation
+        back, _ = step_robot_state(pos, (angle + 180) % 360, "F")
+        return back, angle
+
+    elif command == "TR":
+        return pos, (angle + 90) % 360
+    elif command == "TL":
+        return pos, (angle - 90) % 360
+    # "AB", half moves ("HB" is always undone by the "HF" right after it) and
+    # other block‑specific commands don’t move the robot to another cell
+    return pos, angle
+
+
+class MissionResult:
+    """Everything planned for one block move. Never mutated by the planner afterwards."""
+
+    def __init__(self, block_start, block_goal, block_path, approach, transport, robot_pos, robot_angle,
+                 ok=True, reason=None, stats=None):
+        self.block_start = block_start
+        self.block_goal = block_goal
+        self.block_path = block_path
+        self.approach = approach        # Phase 1 commands
+        self.transport = transport      # Phase 2 commands
+        self.robot_pos = robot_pos      # Robot state once the mission is done
+        self.robot_angle = robot_angle
+        self.ok = ok
+        self.reason = reason            # Why planning failed (None if ok)
+        self.stats = stats or {}        # Phase name -> SearchStats (phases that ran)
+
+    @classmethod
+    def failed(cls, block_start, block_goal, robot_pos, robot_angle, reason, block_path=(), stats=None):
+        """A mission that can't be executed; the robot stays where it is."""
+        return cls(block_start, block_goal, list(block_path), [], [], robot_pos, robot_angle,
+                   ok=False, reason=reason, stats=stats)
+
+    @property
+    def commands(self):
+        return self.approach + self.transport
+
+    def summary(self):
+        """Human readable report (what generate_mission used to print)."""
+        lines = [f"Block: {self.block_start} -> {self.block_goal}"]
+        if not self.ok:
+            lines.append(f"FAILED: {self.reason}")
+        else:
+            lines.append(f"Block Path: {self.block_path}")
+            lines.append(f"Phase 1 (Approach): {len(self.approach)} moves")
+            lines.append(f"Phase 2 (Transport): {len(self.transport)} moves")
+            lines.append(f"Robot ends at {self.robot_pos} facing {self.robot_angle}")
+        for phase_stats in self.stats.values():
+            lines.append(f"  {phase_stats}")
+        return "\n".join(lines)
+
+    def stats_dict(self):
+        """Per-phase search statistics as plain dicts (for logs / JSON)."""
+        return {phase: phase_stats.as_dict() for phase, phase_stats in self.stats.items()}
+
+
+class MissionSegment:
+    """
+    One chunk of a streamed mission ("approach", "transport" or "failed").
+    Iterating a segment yields its commands, so it can be fed to an ActionQueue.
+    """
+
+    def __init__(self, phase, commands, block_pos, robot_pos, robot_angle, reason=None):
+        self.phase = phase
+        self.commands = commands
+        self.block_pos = block_pos      # Block position once the segment is done
+        self.robot_pos = robot_pos      # Robot state once the segment is done
+        self.robot_angle = robot_angle
+        self.reason = reason
+
+    def __iter__(self):
+        return iter(self.commands)
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __str__(self):
+        if self.phase == "failed":
+            return f"[failed] {self.reason}"
+        return f"[{self.phase}] " + " ".join(self.commands)
 
 
 class PathPlanner:
-    def __init__(self, grid):
+    def __init__(self, grid, flat_search=False, maneuvers=None):
         self.grid = grid
+        # flat_search: run both searches on the array-based core (Flat_Search.py);
+        # same rules and costs, far less memory and time on large grids
+        self.flat_search = flat_search
+        # maneuvers: ManeuverLibrary for the turns (defaults to the built-in one)
+        self._maneuvers = maneuvers
+
+    @property
+    def maneuvers(self):
+        if self._maneuvers is None:
+            self._maneuvers = default_library()
+        return self._maneuvers
 
     # =========================================================================
     # CORE UTILITIES
@@ -31,22 +146,7 @@ class PathPlanner:
 
     def apply_command(self, command):
         """Update robot state based on a single command."""
-        if command == "F":
-            # Move forward one cell in the current orientation
-            if self.robot_angle == 0:   # East
-                self.robot_pos = (self.robot_pos[0] + 1, self.robot_pos[1])
-            elif self.robot_angle == 180:  # West
-                self.robot_pos = (self.robot_pos[0] - 1, self.robot_pos[1])
-            elif self.robot_angle == 90:   # South
-                self.robot_pos = (self.robot_pos[0], self.robot_pos[1] + 1)
-            elif self.robot_angle == 270:  # North
-                self.robot_pos = (self.robot_pos[0], self.robot_pos[1] - 1)
-
-        elif command == "TR":
-            self.robot_angle = (self.robot_angle + 90) % 360
-        elif command == "TL":
-            self.robot_angle = (self.robot_angle - 90) % 360
-        # "AB" or other block‑specific commands don’t move the robot itself
+        self.robot_pos, self.robot_angle = step_robot_state(self.robot_pos, self.robot_angle, command)
 
     def apply_commands(self, commands):
         """Apply a sequence of commands to update robot state."""
@@ -93,12 +193,35 @@ class PathPlanner:
             return ["TL", "F", "TR", "F", "TR"]
         return []
 
+    def get_turn_maneuver(self, vec_in, vec_out, grid=None, block=None):
+        """
+        Maneuver that moves the robot behind the block for its new push direction.
+        With grid and block (the cell the block turns on): the fastest
+        collision-free maneuver of the library, None if none fits.
+        Without them: the triangle dance, unchecked.
+        """
+        if grid is not None and block is not None:
+            choice = self.maneuvers.choose(grid, block, vec_in, vec_out)
+            return list(choice[1]) if choice is not None else None
+
+        # Cross product to determine Left vs Right turn
+        # (dx1 * dy2) - (dy1 * dx2). Assuming Y+ is Down.
+        cross = vec_in[0] * vec_out[1] - vec_in[1] * vec_out[0]
+
+        if cross < 0:
+            # RIGHT TURN -> Maneuver Left
+            return self.get_maneuver_sequence("RIGHT_TURN")
+        # LEFT TURN -> Maneuver Right
+        return self.get_maneuver_sequence("LEFT_TURN")
+
     # =========================================================================
     # PHASE 1: APPROACH (Robot -> Behind Block)
     # =========================================================================
 
-    def generate_approach_phase(self, robot_pos, robot_angle, block_start, first_push_direction_node):
+    def generate_approach_phase(self, robot_pos, robot_angle, block_start, first_push_direction_node, grid=None,
+                                stats=None):
         commands = []
+        grid = grid if grid is not None else self.grid
 
         # 1. Calculate the 'Docking Spot' (Where robot must stand to push)
         # Vector: Block -> Next Spot
@@ -112,19 +235,16 @@ class PathPlanner:
 
         # 2. Pathfind to Docking Spot
         # CRITICAL: Treat the block itself as an OBSTACLE so we don't crash into it.
-        # We temporarily set the block cell to 1 (Blocked) in the grid.
-        original_val = self.grid.get_cell(block_start[0], block_start[1])
-        self.grid.set_cell(block_start[0], block_start[1], 1)
+        # The overlay blocks the cell for this query only; the shared grid is untouched.
+        approach_grid = grid.overlay(blocked=[block_start])
 
         # Use standard A* to find path
-        path = astar(self.grid, robot_pos, docking_spot)
-
-        # Restore the grid immediately
-        self.grid.set_cell(block_start[0], block_start[1], original_val)
+        search = flat_astar if self.flat_search else astar
+        path = search(approach_grid, robot_pos, docking_spot, stats=stats)
 
         if not path:
-            print("Error: Cannot find path to docking spot!")
-            return [], robot_angle  # Return empty commands
+            # No route to the docking spot; caller reports the failure
+            return None, robot_angle
 
         # 3. Convert Path to Commands
         current_angle = robot_angle
@@ -157,21 +277,55 @@ class PathPlanner:
     # PHASE 2: TRANSPORT (Push Block -> Goal)
     # =========================================================================
 
-    def get_weighted_block_path(self, start, goal, turn_penalty=5.0):
-        """Custom A* for the Block that penalizes turns."""
+    def get_weighted_block_path(self, start, goal, turn_penalty=5.0, grid=None, heuristic=None, start_dir=None,
+                                prune=None, weight=1.0, budget=None, stats=None):
+        """
+        Custom A* for the Block that penalizes turns.
+        heuristic: optional h(cell, goal); defaults to Manhattan distance.
+        start_dir: direction the block is already being pushed in (first turn is penalized too).
+        prune: optional prune(cell) -> True for deadlocked cells (see Deadlocks.make_pruner).
+        weight: inflates the heuristic (weighted A*, cost <= weight * optimal).
+        budget: optional SearchBudget; raises SearchBudgetExceeded when it runs out.
+        stats: optional SearchStats (counters + profiler hooks).
+        Only pushes with a free cell behind the block (for the robot) are expanded,
+        and turns only if a maneuver of self.maneuvers can re-dock the robot there.
+        """
+        grid = grid if grid is not None else self.grid
+
+        # Different components: no need to flood the whole grid to find out
+        if hasattr(grid, "connected") and not grid.connected(start, goal):
+            return []
+
+        maneuvers = self.maneuvers
+
+        if self.flat_search:
+            with borrow_searcher(grid) as searcher:
+                return searcher.search(grid, start, goal, turn_penalty=turn_penalty, weight=weight,
+                                       heuristic=heuristic, start_dir=start_dir, push=True, prune=prune,
+                                       budget=budget, stats=stats, maneuvers=maneuvers)
 
-        def h(a, b):
+        def manhattan(a, b):
             return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
+        h = heuristic or manhattan
+
         open_set = []
-        heapq.heappush(open_set, (0, 0, start, None))  # (f, count, pos, last_dir)
+        heapq.heappush(open_set, (0, 0, start, start_dir))  # (f, count, pos, last_dir)
         came_from = {}
         g_score = {start: 0}
         count = 0
+        if stats is not None:
+            stats.begin()
+            stats.pushed(start, 0, 1)
 
         while open_set:
             _, _, current, last_dir = heapq.heappop(open_set)
 
+            if stats is not None:
+                stats.popped(current)
+            if budget is not None:
+                budget.charge()
+
             if current == goal:
                 path = []
                 while current in came_from:
@@ -183,26 +337,96 @@ class PathPlanner:
                 return path
 
             cx, cy = current
+            if stats is not None:
+                stats.expanding(current, g_score[current])
             # Neighbors: East, West, South, North
             neighbors = [((cx + 1, cy), (1, 0)), ((cx - 1, cy), (-1, 0)),
                          ((cx, cy + 1), (0, 1)), ((cx, cy - 1), (0, -1))]
 
             for next_pos, direction in neighbors:
                 nx, ny = next_pos
-                if 0 <= nx < self.grid.width_cells and 0 <= ny < self.grid.height_cells:
-                    if self.grid.get_cell(nx, ny) == 0:  # Free
+                if 0 <= nx < grid.width_cells and 0 <= ny < grid.height_cells:
+                    if grid.get_cell(nx, ny) == 0:  # Free
+                        # The robot must stand behind the block to push it
+                        behind = (cx - direction[0], cy - direction[1])
+                        if behind != start and grid.get_cell(behind[0], behind[1]) != 0:
+                            continue
+                        if prune is not None and prune(next_pos):
+                            continue
+
                         cost = 1
-                        if last_dir and last_dir != direction: cost += turn_penalty
+                        turn = last_dir and last_dir != direction
+                        if turn: cost += turn_penalty
 
                         new_g = g_score[current] + cost
                         if next_pos not in g_score or new_g < g_score[next_pos]:
+                            # The robot re-docks with a maneuver (a turn at the start is a new approach)
+                            if turn and current != start and not maneuvers.feasible(grid, current, last_dir,
+                                                                                    direction):
+                                continue
                             g_score[next_pos] = new_g
-                            heapq.heappush(open_set, (new_g + h(next_pos, goal), count, next_pos, direction))
+                            heapq.heappush(open_set, (new_g + weight * h(next_pos, goal), count, next_pos, direction))
                             came_from[next_pos] = (current, direction)
                             count += 1
+                            if stats is not None:
+                                stats.pushed(next_pos, new_g, len(open_set))
         return []
 
-    def generate_transport_phase(self, block_path):
+    def block_path_cost(self, path, start_dir=None, turn_penalty=5.0):
+        """Cost of a block path as get_weighted_block_path counts it."""
+        cost = path_cost(path, turn_penalty)
+        if start_dir and len(path) > 1 and (path[1][0] - path[0][0], path[1][1] - path[0][1]) != start_dir:
+            cost += turn_penalty
+        return cost
+
+    def anytime_block_path(self, start, goal, grid=None, heuristic=None, start_dir=None, prune=None,
+                           time_budget=None, expansion_budget=None, background=True, stats=None):
+        """
+        Anytime get_weighted_block_path: returns a started AnytimeSearch.
+        search.take() gives a path within weights[0] of optimal at once and the
+        best refinement found so far later on.
+        stats: SearchStats for every round; in the background each round is
+        also timed into it (inline, the caller times the whole call).
+        """
+        def search(weight, budget):
+            return self.get_weighted_block_path(start, goal, grid=grid, heuristic=heuristic, start_dir=start_dir,
+                                                prune=prune, weight=weight, budget=budget, stats=stats)
+
+        if background and stats is not None:
+            untimed = search
+
+            def search(weight, budget):
+                with stats.timer():
+                    return untimed(weight, budget)
+
+        def cost(path):
+            return self.block_path_cost(path, start_dir)
+
+        return AnytimeSearch(search, cost, DEFAULT_WEIGHTS, time_budget, expansion_budget).start(background)
+
+    def block_path_valid(self, path, grid, prune=None):
+        """True if every push and turn of path is still possible on grid (and not pruned)."""
+        if len(path) < 2:
+            return False
+        last = None
+        for prev, cell in zip(path, path[1:]):
+            d = (cell[0] - prev[0], cell[1] - prev[1])
+            behind = (prev[0] - d[0], prev[1] - d[1])
+            if not grid.is_free(*cell) or (prune is not None and prune(cell)):
+                return False
+            if behind != path[0] and not grid.is_free(*behind):
+                return False
+            if last is not None and last != d and not self.maneuvers.feasible(grid, prev, last, d):
+                return False
+            last = d
+        return True
+
+    def generate_transport_phase(self, block_path, grid=None):
+        """
+        Push commands along block_path. With grid, every turn uses the fastest
+        collision-free maneuver (None is returned if a turn has none);
+        without it, the triangle dance.
+        """
         commands = []
 
         if len(block_path) < 2: return []
@@ -226,17 +450,11 @@ class PathPlanner:
                 # STRAIGHT
                 commands.append("F")
             else:
-                # TURN - Apply "Triangle Dance"
-                # Cross product to determine Left vs Right turn
-                # (dx1 * dy2) - (dy1 * dx2). Assuming Y+ is Down.
-                cross = vec_in[0] * vec_out[1] - vec_in[1] * vec_out[0]
-
-                if cross < 0:
-                    # RIGHT TURN -> Maneuver Left
-                    commands.extend(self.get_maneuver_sequence("RIGHT_TURN"))
-                else:
-                    # LEFT TURN -> Maneuver Right
-                    commands.extend(self.get_maneuver_sequence("LEFT_TURN"))
+                # TURN - Re-dock behind the block for the new direction
+                maneuver = self.get_turn_maneuver(vec_in, vec_out, grid=grid, block=curr)
+                if maneuver is None:
+                    return None
+                commands.extend(maneuver)
 
                 # After the maneuver, the robot *prepares to push again*:
                 # ensure alignment before the push
@@ -249,48 +467,290 @@ class PathPlanner:
     # MASTER FUNCTION
     # =========================================================================
 
-    def generate_mission(self, robot_pos, robot_angle, block_start, block_goal):
+    def plan_mission(self, robot_pos, robot_angle, block_start, block_goal, grid=None, heuristic=None,
+                     pending=(), static_grid=None, time_budget=None, hooks=None):
         """
-        Returns the COMPLETE list of commands for the entire mission.
+        Stateless planning: always returns a MissionResult (check .ok / .reason).
+        Touches neither self.robot_pos/robot_angle nor the grid, so one planner
+        can serve several threads at once.
+        pending / static_grid: other blocks that still have to move and the
+        obstacles that never will; used to prune pushes that would freeze them.
+        time_budget: seconds of anytime refinement for the block path after a
+        quick weighted search (None = one optimal search, however long it takes).
+        The refinement runs inline: this call returns only once it has found
+        the optimal path or the budget is spent. The result can't change after
+        it is returned, so only stream_mission refines in the background.
+        hooks: optional profiler callbacks {"on_expand": f(phase, cell, g),
+        "on_push": f(phase, cell, g), "on_pop": f(phase, cell)}.
+        The result's .stats holds a SearchStats per phase that ran.
         """
-        print(f"--- PLANNING MISSION ---")
-        print(f"Robot: {robot_pos} facing {robot_angle}")
-        print(f"Block: {block_start} -> {block_goal}")
+        grid = grid if grid is not None else self.grid
 
+        if block_start == block_goal:
+            return MissionResult(block_start, block_goal, [block_start], [], [], robot_pos, robot_angle)
 
-        self.set_robot_state(robot_pos, robot_angle)
+        stats = {}
 
+        def phase(name):
+            stats[name] = self.phase_stats(name, hooks)
+            return stats[name]
 
-        full_queue = []
+        # 0. Fail fast on missions that can't work, before any search
+        with phase("checks").timer():
+            reason = check_mission_feasible(grid, robot_pos, block_start, block_goal)
+            if reason is None and block_start not in live_squares(grid, block_goal) \
+                    and grid.get_cell(*block_start) == 0:
+                reason = "block start is a dead square for this goal"
+            prune = make_pruner(grid, block_goal, pending=pending, static_grid=static_grid)
+        if reason is not None:
+            return MissionResult.failed(block_start, block_goal, robot_pos, robot_angle, reason, stats=stats)
 
         # 1. Plan Block Path
-        block_path = self.get_weighted_block_path(block_start, block_goal)
+        block_stats = phase("block_path")
+        with block_stats.timer():
+            if time_budget is None:
+                block_path = self.get_weighted_block_path(block_start, block_goal, grid=grid, heuristic=heuristic,
+                                                          prune=prune, stats=block_stats)
+            else:
+                block_path = self.anytime_block_path(block_start, block_goal, grid=grid, heuristic=heuristic,
+                                                     prune=prune, time_budget=time_budget, background=False,
+                                                     stats=block_stats).result()
         if len(block_path) < 2:
-            print("Block already at goal or no path found.")
-            return []
-
-        print(f"Block Path: {block_path}")
+            return MissionResult.failed(block_start, block_goal, robot_pos, robot_angle, "no block path",
+                                        stats=stats)
 
         # 2. Phase 1: Approach
-        approach_cmds, new_angle = self.generate_approach_phase(
-            robot_pos, robot_angle, block_start, block_path[1]
-        )
-        if not approach_cmds and robot_pos != block_start:
-            # If empty but not at start, pathing failed
-            # If robot is already at docking spot, this is fine
-            pass
-
-        full_queue.extend(approach_cmds)
-        self.apply_commands(approach_cmds)
-        print(f"Phase 1 (Approach): {len(approach_cmds)} moves")
-
-
+        approach_stats = phase("approach")
+        with approach_stats.timer():
+            approach_cmds, _ = self.generate_approach_phase(
+                robot_pos, robot_angle, block_start, block_path[1], grid=grid, stats=approach_stats
+            )
+        if approach_cmds is None:
+            return MissionResult.failed(block_start, block_goal, robot_pos, robot_angle,
+                                        "no path to docking spot", block_path, stats=stats)
 
         # 3. Phase 2: Transport
-        transport_cmds = self.generate_transport_phase(block_path)
-        full_queue.extend(transport_cmds)
-        self.apply_commands(transport_cmds) 
-        print(f"Phase 2 (Transport): {len(transport_cmds)} moves")
+        with phase("transport").timer():
+            transport_cmds = self.generate_transport_phase(block_path, grid=grid)
+        if transport_cmds is None:
+            return MissionResult.failed(block_start, block_goal, robot_pos, robot_angle,
+                                        "no collision-free turn maneuver", block_path, stats=stats)
+
+        pos, angle = robot_pos, robot_angle
+        for cmd in approach_cmds + transport_cmds:
+            pos, angle = step_robot_state(pos, angle, cmd)
+
+        return MissionResult(block_start, block_goal, block_path,
+                             approach_cmds, transport_cmds, pos, angle, stats=stats)
+
+    @staticmethod
+    def phase_stats(phase, hooks=None):
+        """SearchStats for one planning phase; hooks get the phase name as first argument."""
+        hooks = hooks or {}
+        bound = {name: partial(hooks[name], phase) for name in ("on_expand", "on_push", "on_pop") if hooks.get(name)}
+        return SearchStats(phase, **bound)
+
+    def plan_missions(self, jobs, robot_pos, robot_angle, grid=None, time_budget=None, hooks=None,
+                      heuristic=None, obstacles=()):
+        """
+        Batch entry point: plan a list of (block_start, block_goal) jobs in order.
+
+        grid holds the static arena; the blocks of all jobs are tracked here and
+        laid over it as obstacles (a block counts as moved once its job succeeds).
+        Those are the only blocks known here: any other block in the arena must
+        be passed as obstacles (cells that stay blocked for every job).
+        Every job's grid is an overlay of the same arena, so the per-arena caches
+        (dead squares, connectivity, flat search arrays) are built once for all.
+        A job that starts where an earlier job leaves its block moves that
+        block again (it fails if the earlier job did). Pushes that would
+        freeze a block still waiting for a job of its own are pruned.
+        time_budget / hooks / heuristic: passed to every plan_mission call
+        (so every job may take up to time_budget, see plan_mission)
+        (heuristic defaults to Manhattan distance: a BFS distance field per goal
+        costs more than it saves, see benchmarks/bench_search.py --missions).
+
+        Returns: list of MissionResult, one per job (failed jobs have ok=False
+        and leave the robot and the block where they were).
+        """
+        grid = grid if grid is not None else self.grid
+        obstacles = [tuple(cell) for cell in obstacles]
+
+        # A job starting where an earlier job leaves its block moves that block again
+        owner = []          # Job -> block
+        positions = []      # Block -> current cell
+        final = []          # Block -> goal of its last job
+        remaining = []      # Block -> jobs still to plan
+        planned = {}        # Cell -> block that the jobs so far leave there
+        for block_start, block_goal in jobs:
+            block_start, block_goal = tuple(block_start), tuple(block_goal)
+            b = planned.pop(block_start, None)
+            if b is None:
+                b = len(positions)
+                positions.append(block_start)
+                final.append(block_goal)
+                remaining.append(0)
+            planned[block_goal] = b
+            final[b] = block_goal
+            remaining[b] += 1
+            owner.append(b)
+
+        results = []
+        for i, (block_start, block_goal) in enumerate(jobs):
+            block_start, block_goal = tuple(block_start), tuple(block_goal)
+            b = owner[i]
+            remaining[b] -= 1
+            if positions[b] != block_start:
+                results.append(MissionResult.failed(block_start, block_goal, robot_pos, robot_angle,
+                                                    f"block is at {positions[b]}, an earlier move failed"))
+                continue
+
+            others = [p for k, p in enumerate(positions) if k != b]
+            job_grid = grid.overlay(blocked=others + obstacles)
+
+            # Blocks already on their last goal never move again; the rest still have to
+            settled = obstacles + [p for k, p in enumerate(positions)
+                                   if k != b and not remaining[k] and p == final[k]]
+            pending = [p for k, p in enumerate(positions)
+                       if k != b and (remaining[k] or p != final[k])]
+
+            result = self.plan_mission(robot_pos, robot_angle, block_start, block_goal,
+                                       grid=job_grid, heuristic=heuristic,
+                                       pending=pending, static_grid=grid.overlay(blocked=settled),
+                                       time_budget=time_budget, hooks=hooks)
+            results.append(result)
+
+            if result.ok:
+                positions[b] = block_goal
+                robot_pos, robot_angle = result.robot_pos, result.robot_angle
+
+        return results
+
+    def stream_mission(self, robot_pos, robot_angle, block_start, block_goal, world=None, pending=(),
+                       time_budget=None, stats=None, hooks=None):
+        """
+        Generator version of plan_mission: yields MissionSegments on demand.
+
+        The first segment is the approach, then one transport segment per
+        straight push run (ending with the turn maneuver, if any). Before every
+        segment the block path is re-planned from where the block is now
+        against world() (a callable returning the latest GridMap / overlay),
+        so the robot can start moving after the first segment is planned.
+        pending: cells of other blocks that still have to move (see plan_mission).
+
+        time_budget: anytime mode. Each block path starts as a quick weighted
+        search; while the robot executes a segment, the path from where that
+        segment leaves the block is refined in the background for up to
+        time_budget seconds, and the next segment takes the best one found
+        (if it still fits the latest world, otherwise it is planned afresh).
+
+        stats: optional dict, filled with a SearchStats per phase (as in
+        MissionResult.stats) that add up over all segments; background
+        refinement counts as "refine". hooks: see plan_mission.
+        """
+        stats = {} if stats is None else stats
+
+        def phase(name):
+            if name not in stats:
+                stats[name] = self.phase_stats(name, hooks)
+            return stats[name]
+
+        def current_grid():
+            return world() if world is not None else self.grid
+
+        block = tuple(block_start)
+        block_goal = tuple(block_goal)
+        pos, angle = robot_pos, robot_angle
+        push_dir = None     # Direction the robot is docked for (None = not docked)
+        refiner = None      # Anytime search for (block, push_dir), running while the robot drives
+        first_weight = DEFAULT_WEIGHTS[0] if time_budget is not None else 1.0
+
+        while block != block_goal:
+            grid = current_grid()
+
+            with phase("checks").timer():
+                prune = make_pruner(grid, block_goal, pending=pending)
+            path = None
+            if refiner is not None:
+                path = refiner.take()
+                refiner.done.wait()     # Its last round is cancelled; the next refiner shares its stats
+                refiner = None
+                if not self.block_path_valid(path, grid, prune):
+                    path = None     # The world changed under the refined plan
+            if path is None:
+                block_stats = phase("block_path")
+                with block_stats.timer():
+                    path = self.get_weighted_block_path(block, block_goal, grid=grid, start_dir=push_dir,
+                                                        prune=prune, weight=first_weight, stats=block_stats)
+            if len(path) < 2:
+                yield MissionSegment("failed", [], block, pos, angle, "no block path")
+                return
+
+            first_dir = (path[1][0] - block[0], path[1][1] - block[1])
+
+            # ---- Approach (or re-dock if the new plan pushes another way) ----
+            if first_dir != push_dir:
+                approach_stats = phase("approach")
+                with approach_stats.timer():
+                    approach_cmds, _ = self.generate_approach_phase(pos, angle, block, path[1], grid=grid,
+                                                                    stats=approach_stats)
+                if approach_cmds is None:
+                    yield MissionSegment("failed", [], block, pos, angle, "no path to docking spot")
+                    return
+                for cmd in approach_cmds:
+                    pos, angle = step_robot_state(pos, angle, cmd)
+                push_dir = first_dir
+                if time_budget is not None:
+                    refiner = self.anytime_block_path(block, block_goal, grid=grid, start_dir=push_dir, prune=prune,
+                                                      time_budget=time_budget, stats=phase("refine"))
+                yield MissionSegment("approach", approach_cmds, block, pos, angle)
+                # The world may have changed while the robot drove; plan again from here
+                continue
+
+            # ---- Transport: straight run up to the next turn ----
+            run = 1
+            while run + 1 < len(path) and \
+                    (path[run + 1][0] - path[run][0], path[run + 1][1] - path[run][1]) == push_dir:
+                run += 1
+
+            commands = ["AB"] + ["F"] * run
+            block = path[run]
+
+            if block != block_goal:
+                vec_out = (path[run + 1][0] - block[0], path[run + 1][1] - block[1])
+                with phase("transport").timer():
+                    maneuver = self.get_turn_maneuver(push_dir, vec_out, grid=grid, block=block)
+                if maneuver is None:
+                    yield MissionSegment("failed", [], path[0], pos, angle, "no collision-free turn maneuver")
+                    return
+                commands.extend(maneuver)
+                push_dir = vec_out
+
+            for cmd in commands:
+                pos, angle = step_robot_state(pos, angle, cmd)
+
+            if time_budget is not None and block != block_goal:
+                refiner = self.anytime_block_path(block, block_goal, grid=grid, start_dir=push_dir, prune=prune,
+                                                  time_budget=time_budget, stats=phase("refine"))
+            yield MissionSegment("transport", commands, block, pos, angle)
+
+    def generate_mission(self, robot_pos, robot_angle, block_start, block_goal, grid=None, verbose=False,
+                         time_budget=None, hooks=None):
+        """
+        Returns the COMPLETE list of commands for the entire mission.
+        grid: optional GridMap / GridOverlay to plan against (defaults to self.grid)
+        time_budget: optional anytime budget in seconds for the block path
+        hooks: optional profiler callbacks (see plan_mission)
+        verbose: print the MissionResult summary (off by default)
+        Use plan_mission() to get the structured MissionResult instead.
+        """
+        result = self.plan_mission(robot_pos, robot_angle, block_start, block_goal, grid=grid,
+                                   time_budget=time_budget, hooks=hooks)
+
+        if verbose:
+            print(f"--- PLANNING MISSION ---")
+            print(f"Robot: {robot_pos} facing {robot_angle}")
+            print(result.summary())
 
+        self.set_robot_state(result.robot_pos, result.robot_angle)
 
-        return full_queue
\ No newline at end of file
+        return result.commands
@@ -0,0 +1,222 @@
+import json
+import queue
+import socketserver
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from PathPlanner import PathPlanner
+
+
+class MissionRequest:
+    """One block move asked for by a client."""
+
+    def __init__(self, robot_pos, robot_angle, block_start, block_goal, arena_id="default"):
+        self.robot_pos = tuple(robot_pos)
+        self.robot_angle = robot_angle
+        self.block_start = tuple(block_start)
+        self.block_goal = tuple(block_goal)
+        self.arena_id = arena_id
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["robot_pos"], data["robot_angle"],
+                   data["block_start"], data["block_goal"],
+                   data.get("arena_id", "default"))
+
+
+def plan_batch(arena, requests):
+    """
+    Worker entry point: plan several requests against one arena snapshot
+    (or a live World_State.SharedGridView, re-planned if it changed meanwhile).
+    Module-level so it can also run inside a ProcessPoolExecutor.
+    """
+    planner = PathPlanner(arena)
+
+    def plan(r):
+        return planner.plan_mission(r.robot_pos, r.robot_angle, r.block_start, r.block_goal)
+
+    consistent = getattr(arena, "consistent", None)
+    if consistent is not None:
+        return [consistent(lambda _, r=r: plan(r)) for r in requests]
+    return [plan(r) for r in requests]
+
+
+class PlanningService:
+    """
+    Long-lived planner shared by several clients.
+
+    - Arenas are registered once and stored as immutable ArenaSnapshots,
+      or shared: a World_State.SharedGridView is kept as is, and process
+      workers attach to its shared memory instead of unpickling a copy.
+    - Requests are grouped per arena into batches of up to batch_size and
+      handed to a worker pool (threads, or processes with use_processes=True).
+    - At most max_pending requests may be in flight; submit() blocks (or
+      raises queue.Full with block=False) until a slot frees up.
+    """
+
+    def __init__(self, workers=4, max_pending=64, batch_size=8, batch_window=0.002, use_processes=False):
+        self.batch_size = batch_size
+        self.batch_window = batch_window    # seconds to wait for a batch to fill up
+
+        self.arenas = {}    # arena_id -> ArenaSnapshot / SharedGridView
+        self._arena_lock = threading.Lock()
+
+        pool = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self._executor = pool(max_workers=workers)
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._incoming = queue.Queue()
+        self._running = True
+        self._running_lock = threading.Lock()     # No request is queued behind the stop marker
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+
+    # ---------------- Arenas -----------------
+    def register_arena(self, arena_id, grid):
+        """
+        Store an immutable snapshot of grid under arena_id (replaces older ones).
+        A SharedGridView has no snapshot(): it is stored as is, so every
+        request plans against the writer's latest cells.
+        """
+        snapshot = grid.snapshot() if hasattr(grid, "snapshot") else grid
+        with self._arena_lock:
+            self.arenas[arena_id] = snapshot
+
+    def get_arena(self, arena_id):
+        with self._arena_lock:
+            return self.arenas.get(arena_id)
+
+    # ---------------- Requests -----------------
+    def submit(self, request, block=True, timeout=None):
+        """Queue one MissionRequest, returns a Future resolving to a MissionResult."""
+        if not self._running:
+            raise RuntimeError("PlanningService is shut down")
+        if self.get_arena(request.arena_id) is None:
+            raise KeyError(f"Unknown arena: {request.arena_id}")
+
+        if not self._slots.acquire(blocking=block, timeout=timeout):
+            raise queue.Full("Too many pending planning requests")
+
+        with self._running_lock:
+            if not self._running:
+                self._slots.release()
+                raise RuntimeError("PlanningService is shut down")
+            future = Future()
+            future.add_done_callback(lambda _: self._slots.release())
+            self._incoming.put((request, future))
+        return future
+
+    def submit_many(self, requests, block=True, timeout=None):
+        return [self.submit(r, block=block, timeout=timeout) for r in requests]
+
+    def plan(self, request, timeout=None):
+        """Blocking convenience wrapper around submit()."""
+        return self.submit(request).result(timeout)
+
+    def plan_many(self, requests, timeout=None):
+        return [f.result(timeout) for f in self.submit_many(requests)]
+
+    # ---------------- Dispatcher -----------------
+    def _dispatch_loop(self):
+        while True:
+            item = self._incoming.get()
+            if item is None:
+                return
+
+            # Collect a batch: whatever arrives within batch_window, up to batch_size
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._incoming.get(timeout=self.batch_window)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._incoming.put(None)    # re-queue the stop marker
+                    break
+                batch.append(item)
+
+            # One worker job per arena
+            by_arena = {}
+            for request, future in batch:
+                by_arena.setdefault(request.arena_id, []).append((request, future))
+
+            for arena_id, items in by_arena.items():
+                futures = [f for _, f in items]
+                if not all(f.set_running_or_notify_cancel() for f in futures):
+                    # Some were cancelled; plan only the rest
+                    items = [(r, f) for r, f in items if not f.cancelled()]
+                    if not items:
+                        continue
+                try:
+                    job = self._executor.submit(plan_batch, self.get_arena(arena_id), [r for r, _ in items])
+                except Exception as e:
+                    for _, f in items:
+                        f.set_exception(e)
+                    continue
+                job.add_done_callback(lambda job, items=items: self._resolve(job, items))
+
+    @staticmethod
+    def _resolve(job, items):
+        try:
+            results = job.result()
+        except Exception as e:
+            for _, f in items:
+                f.set_exception(e)
+            return
+        for (_, f), result in zip(items, results):
+            f.set_result(result)
+
+    # ---------------- Lifecycle -----------------
+    def shutdown(self, wait=True):
+        with self._running_lock:
+            if not self._running:
+                return
+            self._running = False
+            self._incoming.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+# =========================================================================
+# LOCAL TCP FRONT-END (one JSON request per line, one JSON answer per line)
+# =========================================================================
+
+class _MissionHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = MissionRequest.from_dict(json.loads(line))
+                result = self.server.service.plan(request)
+                if not result.ok:
+                    reply = {"ok": False, "error": result.reason, "stats": result.stats_dict()}
+                else:
+                    reply = {
+                        "ok": True,
+                        "commands": result.commands,
+                        "robot_pos": list(result.robot_pos),
+                        "robot_angle": result.robot_angle,
+                        "stats": result.stats_dict(),
+                    }
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+
+class PlanningServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service, host="127.0.0.1", port=8765):
+        self.service = service
+        super().__init__((host, port), _MissionHandler)
@@ -0,0 +1,195 @@
+# Simulator/Thymio_Headless.py
+import math
+import time
+
+from Core.Run_Log import ReplayReport
+from Core.Thymio_Interface import RobotInterface
+from Environment.Scenario import Scenario
+
+
+class HeadlessThymio(RobotInterface):
+    """
+    Grid simulator without any rendering (never imports pygame).
+    Same movement / block pushing rules as SimThymio, which builds on it.
+    Only blocks stop the robot (walls and the arena border don't), and B
+    pushes a block behind it; validate_commands() rejects all of these.
+    """
+
+    def __init__(self):
+        # Grid setup
+        self.grid = None
+        self.block_manager = None
+        self.cell_size = 1
+        self.path = None
+
+        # Robot state (in grid coords)
+        self.grid_x = 0
+        self.grid_y = 0
+        self.angle = 0      # 0=right, 90=up, 180=left, 270=down
+
+    # -------------------- Setup ----------------------------
+
+    def set_grid(self, grid):
+        self.grid = grid
+        self.cell_size = grid.cell_size
+
+    def set_path(self, path):
+        self.path = path
+
+    def set_block_manager(self, bm):
+        self.block_manager = bm
+
+    # -------------------- Planner frame --------------------
+    # The planner uses 0=East, 90=South (Y+ down); the simulator counts
+    # angles the other way round (90=up), so convert at the boundary.
+
+    def set_grid_pose(self, pos, planner_angle):
+        self.grid_x, self.grid_y = pos
+        self.angle = (-planner_angle) % 360
+
+    def get_grid_pose(self):
+        """Return ((x, y), angle) in the planner's convention."""
+        return (self.grid_x, self.grid_y), (-self.angle) % 360
+
+    # -------------------- Movement -------------------------
+
+    def _forward_vector(self):
+        """Return dx, dy based on current angle."""
+        if self.angle == 0: return (1, 0)
+        if self.angle == 90: return (0, -1)
+        if self.angle == 180: return (-1, 0)
+        if self.angle == 270: return (0, 1)
+
+    def _get_block_at(self, gx, gy):
+        """Return block at given grid cell, or None."""
+        if not self.block_manager:
+            return None
+        for block in self.block_manager.blocks.values():
+            bx, by = int(block.x), int(block.y)
+            if bx == gx and by == gy:
+                return block
+        return None
+
+    def move_forward(self):
+        dx, dy = self._forward_vector()
+        new_x = self.grid_x + dx
+        new_y = self.grid_y + dy
+
+        block = self._get_block_at(new_x, new_y)
+        if block:
+            # Try to push block further
+            block_new_x = new_x + dx
+            block_new_y = new_y + dy
+            # Only push if target cell is empty
+            if not self._get_block_at(block_new_x, block_new_y):
+                block.x = block_new_x
+                block.y = block_new_y
+                # Move robot into block's old cell
+                self.grid_x = new_x
+                self.grid_y = new_y
+        else:
+            # No block, move freely
+            self.grid_x = new_x
+            self.grid_y = new_y
+
+    def move_backward(self):
+        dx, dy = self._forward_vector()
+        new_x = self.grid_x - dx
+        new_y = self.grid_y - dy
+
+        block = self._get_block_at(new_x, new_y)
+        if block:
+            block_new_x = new_x - dx
+            block_new_y = new_y - dy
+            if not self._get_block_at(block_new_x, block_new_y):
+                block.x = block_new_x
+                block.y = block_new_y
+                self.grid_x = new_x
+                self.grid_y = new_y
+        else:
+            self.grid_x = new_x
+            self.grid_y = new_y
+
+    def rotate_left(self):
+        self.angle = (self.angle + 90) % 360
+
+    def rotate_right(self):
+        self.angle = (self.angle - 90) % 360
+
+    def find_block(self):
+        """Simply turn around 180 degrees."""
+        self.angle = (self.angle + 180) % 360
+
+    def align_block(self):
+        """Blocks are always grid aligned in the simulator."""
+        pass
+
+    def half_back(self):
+        """Poses are whole cells here, and HB is always undone by the HF right after it (see validate_commands)."""
+        pass
+
+    def half_forward(self):
+        pass
+
+    # -------------------- Odometry -------------------------
+
+    def get_position(self):
+        """Return pixel center + heading in radians."""
+        px = self.grid_x * self.cell_size + self.cell_size // 2
+        py = self.grid_y * self.cell_size + self.cell_size // 2
+        return px, py, math.radians(self.angle)
+
+    # -------------------- Loop Update ----------------------
+
+    def update(self, dt):
+        # Nothing to render
+        pass
+
+    # -------------------- Replay ---------------------------
+
+    def world_state(self):
+        """((x, y), planner angle, {block name: (x, y)}) right now."""
+        pos, angle = self.get_grid_pose()
+        blocks = {}
+        if self.block_manager:
+            for name, block in self.block_manager.blocks.items():
+                blocks[name] = (int(block.x), int(block.y))
+        return pos, angle, blocks
+
+    def replay(self, run, speed=None, setup=True):
+        """
+        Re-execute a recorded run (Core.Run_Log.RunRecord) and diff the world
+        after every step against the state stored in the log.
+
+        speed : 1.0 = recorded timing, 2.0 = twice as fast, None = no waiting
+        setup : rebuild arena, blocks and robot pose from the run's metadata first
+        Returns a ReplayReport.
+        """
+        if setup:
+            scenario = Scenario.from_dict(run.meta, run.meta.get("name", "replay"))
+            self.set_grid(scenario.build_grid())
+            self.set_block_manager(scenario.build_block_manager())
+            self.set_grid_pose(scenario.robot_start, scenario.robot_angle)
+
+        report = ReplayReport(run.meta.get("name", "replay"))
+        start = time.perf_counter()
+        last_frame = start
+
+        for step, event in enumerate(run.events):
+            if speed:
+                due = start + event.t / speed
+                while time.perf_counter() < due:
+                    now = time.perf_counter()
+                    self.update(now - last_frame)
+                    last_frame = now
+                    time.sleep(min(1 / 60, max(0.0, due - now)))
+
+            self.execute(event.action)
+            now = time.perf_counter()
+            self.update(now - last_frame)
+            last_frame = now
+
+            report.steps += 1
+            report.compare(step, event, *self.world_state())
+
+        return report
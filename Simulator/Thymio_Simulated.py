@@ -1,33 +1,24 @@
 # Simulator/Thymio_Simplified.py
-import math
-
 import pygame, sys
 from Environment.Grid_Map import GridMap
-from Core.Thymio_Interface import RobotInterface
-from Environment.Block_Manager import BlockManager
-class SimThymio(RobotInterface):
-
-    def __init__(self):
-        pygame.init()
-        self.WIDTH, self.HEIGHT = 800, 600
-        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
-        pygame.display.set_caption("Simple Thymio Simulator")
+from Simulator.Thymio_Headless import HeadlessThymio
 
-        # Grid setup
-        self.grid: GridMap = None
-        self.block_manager = None
 
-        # Load images (scaled to 1 grid cell)
-        self.THYMIO_IMG = pygame.image.load("Simulator/sim_assets/thymio.png").convert_alpha()
-        self.CUBE_IMG = pygame.image.load("Simulator/sim_assets/cube.png").convert_alpha()
+class SimThymio(HeadlessThymio):
+    """
+    HeadlessThymio + pygame rendering.
+    The window and the sprites are only created on the first update(), so
+    constructing the simulator costs nothing before planning starts.
+    """
 
-        # These will be scaled later when grid is known
-        self.cell_size = None
+    def __init__(self):
+        super().__init__()
+        self.WIDTH, self.HEIGHT = 800, 600
+        self.screen = None
 
-        # Robot state (in grid coords)
-        self.grid_x = 0
-        self.grid_y = 0
-        self.angle = 0      # 0=right, 90=up, 180=left, 270=down
+        # Loaded (and scaled to 1 grid cell) when the display comes up
+        self.THYMIO_IMG = None
+        self.CUBE_IMG = None
 
         # Three cubes (in grid coords)
         self.cubes = [
@@ -39,96 +30,25 @@ class SimThymio(RobotInterface):
     # -------------------- Setup ----------------------------
 
     def set_grid(self, grid: GridMap):
-        self.grid = grid
-        self.cell_size = grid.cell_size
-
-        # Scale assets to grid cell size
-        self.THYMIO_IMG = pygame.transform.scale(self.THYMIO_IMG, (self.cell_size, self.cell_size))
-        self.CUBE_IMG = pygame.transform.scale(self.CUBE_IMG, (self.cell_size, self.cell_size))
-
-    def set_path(self, path):
-        self.path = path
+        super().set_grid(grid)
+        if self.screen is not None:
+            self._load_assets()
 
+    def _ensure_display(self):
+        """Open the window on first use (must run on the main thread)."""
+        if self.screen is not None:
+            return
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
+        pygame.display.set_caption("Simple Thymio Simulator")
+        self._load_assets()
 
-    def set_block_manager(self, bm: BlockManager):
-        self.block_manager = bm
-
-    # -------------------- Movement -------------------------
-
-    def _forward_vector(self):
-        """Return dx, dy based on current angle."""
-        if self.angle == 0: return (1, 0)
-        if self.angle == 90: return (0, -1)
-        if self.angle == 180: return (-1, 0)
-        if self.angle == 270: return (0, 1)
-
-    def _get_block_at(self, gx, gy):
-        """Return block at given grid cell, or None."""
-        if not self.block_manager:
-            return None
-        for block in self.block_manager.blocks.values():
-            bx, by = int(block.x), int(block.y)
-            if bx == gx and by == gy:
-                return block
-        return None
-
-    def move_forward(self):
-        dx, dy = self._forward_vector()
-        new_x = self.grid_x + dx
-        new_y = self.grid_y + dy
-
-        block = self._get_block_at(new_x, new_y)
-        if block:
-            # Try to push block further
-            block_new_x = new_x + dx
-            block_new_y = new_y + dy
-            # Only push if target cell is empty
-            if not self._get_block_at(block_new_x, block_new_y):
-                block.x = block_new_x
-                block.y = block_new_y
-                # Move robot into block's old cell
-                self.grid_x = new_x
-                self.grid_y = new_y
-        else:
-            # No block, move freely
-            self.grid_x = new_x
-            self.grid_y = new_y
-
-    def move_backward(self):
-        dx, dy = self._forward_vector()
-        new_x = self.grid_x - dx
-        new_y = self.grid_y - dy
-
-        block = self._get_block_at(new_x, new_y)
-        if block:
-            block_new_x = new_x - dx
-            block_new_y = new_y - dy
-            if not self._get_block_at(block_new_x, block_new_y):
-                block.x = block_new_x
-                block.y = block_new_y
-                self.grid_x = new_x
-                self.grid_y = new_y
-        else:
-            self.grid_x = new_x
-            self.grid_y = new_y
-
-    def rotate_left(self):
-        self.angle = (self.angle + 90) % 360
-
-    def rotate_right(self):
-        self.angle = (self.angle - 90) % 360
-
-    def find_block(self):
-        """Simply turn around 180 degrees."""
-        self.angle = (self.angle + 180) % 360
-
-    # -------------------- Odometry -------------------------
-
-    def get_position(self):
-        """Return pixel center + heading in radians."""
-        px = self.grid_x * self.cell_size + self.cell_size // 2
-        py = self.grid_y * self.cell_size + self.cell_size // 2
-        return px, py, math.radians(self.angle)
+    def _load_assets(self):
+        # Load images (scaled to 1 grid cell)
+        thymio = pygame.image.load("Simulator/sim_assets/thymio.png").convert_alpha()
+        cube = pygame.image.load("Simulator/sim_assets/cube.png").convert_alpha()
+        self.THYMIO_IMG = pygame.transform.scale(thymio, (self.cell_size, self.cell_size))
+        self.CUBE_IMG = pygame.transform.scale(cube, (self.cell_size, self.cell_size))
 
     # -------------------- Render ---------------------------
 
@@ -169,6 +89,14 @@ class SimThymio(RobotInterface):
     # -------------------- Loop Update ----------------------
 
     def update(self, dt):
+        self._ensure_display()
+
+        # Handle Pygame Events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+
         self.screen.fill((187, 218, 227))
 
         self.draw_grid()
@@ -176,4 +104,3 @@ class SimThymio(RobotInterface):
         self.draw_thymio()
 
         pygame.display.flip()
-
@@ -0,0 +1,52 @@
+# Simulator/World_Viewer.py
+import sys
+import time
+
+from Environment.Block_Manager import BlockManager
+from Environment.World_State import attach
+from Simulator.Thymio_Simulated import SimThymio
+
+
+class WorldViewer(SimThymio):
+    """
+    Renderer for a running control loop's shared world (main.py --shared-world):
+    every frame draws the robot and blocks as published, nothing is simulated.
+    Read-only, so any number of viewers can watch one run.
+    """
+
+    def __init__(self, name):
+        super().__init__()
+        self.world = attach(name)
+        self.set_grid(self.world.grid_view())
+        self.set_block_manager(BlockManager())
+
+    def sync(self):
+        """Copy the published robot pose and blocks (one consistent instant)."""
+        pos, angle, blocks = self.world.read()
+        self.set_grid_pose(pos, angle)
+        self.block_manager.blocks = blocks
+
+    def execute(self, action):
+        raise RuntimeError("WorldViewer only shows the shared world, it can't drive")
+
+    def update(self, dt):
+        self.sync()
+        super().update(dt)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python -m Simulator.World_Viewer SHARED_WORLD_NAME")
+        return 2
+    viewer = WorldViewer(argv[0])
+    last_frame = time.perf_counter()
+    while True:     # Closing the window exits (SimThymio.update)
+        now = time.perf_counter()
+        viewer.update(now - last_frame)
+        last_frame = now
+        time.sleep(max(0.0, 1 / 60 - (time.perf_counter() - now)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
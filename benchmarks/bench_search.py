@@ -0,0 +1,166 @@
+"""
+Dict-based searches vs the flat array core (Environment/Flat_Search.py).
+
+    python benchmarks/bench_search.py [--sizes 200 500 1000] [--density 0.2]
+    python benchmarks/bench_search.py --missions [--sizes 120] [--jobs 100]
+
+Random arena (fixed seed), query from one corner to the other. Time is the
+best of --runs without tracing; MB columns are tracemalloc peaks of one
+query ("flat" reuses the scratch arrays, "cold" includes allocating them).
+
+Reference run (CPython 3.11, density 0.2):
+
+    search             cells   dict ms   flat ms  speedup   dict MB   flat MB   cold MB
+    robot A*           40000     161.0     103.3     1.6x       6.8       0.1       1.1
+    block A*           40000     196.3     102.1     1.9x       6.4       0.1       1.1
+    robot A*          250000    1117.2     498.4     2.2x      57.7       0.2       7.0
+    block A*          250000    1476.1     747.3     2.0x      50.5       0.1       7.0
+    robot A*         1000000    5842.3    2288.9     2.6x     243.6       0.3      28.1
+    block A*         1000000    7675.2    3433.4     2.2x     208.4       0.2      28.1
+
+Block A* checks every turn it takes against the maneuver library
+(Environment/Maneuvers.py); on this cluttered arena that adds up to
+about half to either core.
+
+--missions times PathPlanner.plan_missions on random jobs (arena density
+0.05) with its default Manhattan block heuristic against a BFS distance
+field per goal. Structure goals are all different, so every field is a
+full-arena BFS that the searches never earn back (both timed after one
+warm-up pass, which builds the per-arena dead square tables):
+
+    jobs    cells   manhattan ms   bfs field ms   ok
+     100    14400         3099.4         4521.1   98
+
+The flat core's fixed cost is 25 bytes per cell (g, heap key, parent,
+stamp, passable), allocated once per arena and reused by later queries.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Environment.Grid_Map import GridMap, BLOCKED, FREE
+from Environment.a_star import astar, distance_field
+from Environment.Flat_Search import FlatGridSearch, flat_astar
+from PathPlanner import PathPlanner
+
+
+def build_arena(size, density, seed=1):
+    rng = random.Random(seed)
+    grid = GridMap(width_cells=size, height_cells=size)
+    for _ in range(int(size * size * density)):
+        grid.set_cell(rng.randrange(size), rng.randrange(size), BLOCKED)
+    # Keep both corners open (room for the robot to push the block out / in)
+    for x in range(5):
+        for y in range(5):
+            grid.set_cell(x, y, FREE)
+            grid.set_cell(size - 1 - x, size - 1 - y, FREE)
+    return grid
+
+
+def measure(fn, runs):
+    best = float("inf")
+    result = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def random_jobs(grid, count, seed=2):
+    """count (block_start, block_goal) jobs on distinct free cells away from the border."""
+    rng = random.Random(seed)
+    size = grid.width_cells
+    cells = [(x, y) for x in range(2, size - 2) for y in range(2, size - 2) if grid.get_cell(x, y) == FREE]
+    rng.shuffle(cells)
+    return [(cells[i], cells[count + i]) for i in range(count)]
+
+
+def field_heuristic(grid):
+    """Block heuristic from a BFS distance field per goal (computed on first use)."""
+    fields = {}
+
+    def heuristic(cell, goal):
+        field = fields.get(goal)
+        if field is None:
+            field = fields[goal] = distance_field(grid, goal)
+        d = field.get(cell)
+        return d if d is not None else abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])
+    return heuristic
+
+
+def bench_missions(args):
+    print(f"{'jobs':>6}{'cells':>9}{'manhattan ms':>15}{'bfs field ms':>15}{'ok':>5}")
+    for size in args.sizes:
+        grid = build_arena(size, 0.05)
+        jobs = random_jobs(grid, args.jobs)
+        planner = PathPlanner(grid)
+        planner.plan_missions(jobs, (0, 0), 0)     # Warm up the per-arena caches (dead squares) for both
+        t0 = time.perf_counter()
+        results = planner.plan_missions(jobs, (0, 0), 0)
+        manhattan = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        field_results = planner.plan_missions(jobs, (0, 0), 0, heuristic=field_heuristic(grid))
+        field = time.perf_counter() - t0
+        ok = sum(r.ok for r in results)
+        assert ok == sum(r.ok for r in field_results)
+        print(f"{args.jobs:>6}{size * size:>9}{manhattan * 1000:>15.1f}{field * 1000:>15.1f}{ok:>5}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--missions", action="store_true",
+                        help="time plan_missions: Manhattan vs BFS distance field block heuristic")
+    parser.add_argument("--jobs", type=int, default=100)
+    args = parser.parse_args(argv)
+    if args.missions:
+        args.sizes = args.sizes or [120]
+        return bench_missions(args)
+    args.sizes = args.sizes or [200, 500, 1000]
+
+    print(f"{'search':<14}{'cells':>10}{'dict ms':>10}{'flat ms':>10}{'speedup':>9}"
+          f"{'dict MB':>10}{'flat MB':>10}{'cold MB':>10}")
+    for size in args.sizes:
+        grid = build_arena(size, args.density)
+        start, goal = (2, 2), (size - 3, size - 3)
+        dict_planner = PathPlanner(grid)
+        flat_planner = PathPlanner(grid, flat_search=True)
+
+        queries = {
+            "robot A*": (lambda: astar(grid, start, goal),
+                         lambda: flat_astar(grid, start, goal),
+                         {}),
+            "block A*": (lambda: dict_planner.get_weighted_block_path(start, goal),
+                         lambda: flat_planner.get_weighted_block_path(start, goal),
+                         {"turn_penalty": 5.0, "push": True}),
+        }
+        for name, (dict_fn, flat_fn, flat_args) in queries.items():
+            # Cold: a fresh searcher allocates its arrays on this query
+            tracemalloc.start()
+            FlatGridSearch(grid).search(grid, start, goal, **flat_args)
+            cold = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            dict_t, dict_peak, dict_path = measure(dict_fn, args.runs)
+            flat_t, flat_peak, flat_path = measure(flat_fn, args.runs)
+            assert bool(dict_path) == bool(flat_path)
+            print(f"{name:<14}{size * size:>10}{dict_t * 1000:>10.1f}{flat_t * 1000:>10.1f}"
+                  f"{dict_t / flat_t:>8.1f}x{dict_peak / 2**20:>10.1f}{flat_peak / 2**20:>10.1f}"
+                  f"{cold / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
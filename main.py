@@ -1,106 +1,400 @@
-import sys
-import pygame as pg
 import time
+START_TIME = time.perf_counter()  # Cold-start reference for "time to first command"
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 from Core.ActionQueue import ActionQueue
-from Environment.Grid_Map import GridMap
-from Core.Thymio_Robot import RealThymio
-from Simulator.Thymio_Simulated import SimThymio
-import pygame as pg
-import Environment.Block_Manager as BlockManager
-import time
-from Environment.a_star import astar
-import Environment.Utils
+from Core.Run_Log import RunLogWriter, read_run_log
+from Environment.Command_Validator import validate_commands
+from Environment.Scenario import Scenario
+from Environment.Utils import planning_overlay
 
 # Import ONLY the class, not the old function
 from PathPlanner import PathPlanner
 
+# pygame / tdmclient are imported lazily in create_robot(), so planning
+# (and the headless backend) never pay for them.
+BACKENDS = ("real", "sim", "headless")
+DEFAULT_SCENARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenarios", "default.json")
 
-def select_robot():
-    print("Select robot mode:")
-    print("1. Real Thymio")
-    print("2. Simulator")
 
-    choice = input("Enter choice: ")
-    return RealThymio() if choice == "1" else SimThymio()
+def create_robot(backend):
+    """Import and build the backend (safe to call from a worker thread)."""
+    if backend == "real":
+        from Core.Thymio_Robot import RealThymio
+        robot = RealThymio(connect=False)
+        robot.connect_async()   # Commands wait for the node (wait_connected); planning doesn't
+        return robot
+    if backend == "sim":
+        from Simulator.Thymio_Simulated import SimThymio
+        return SimThymio()   # The window opens on the first update()
+    from Simulator.Thymio_Headless import HeadlessThymio
+    return HeadlessThymio()
 
 
-def main():
-    robot = select_robot()
-    print("Starting control loop! Press Ctrl+C to stop.")
+def execute_action(robot, action):
+    if not robot.execute(action):
+        print(f"Unknown action: {action}")
 
-    clock = pg.time.Clock()
 
-    # 1. Setup Grid
-    grid = GridMap(width_cells=20, height_cells=15, cell_size=50)
-    robot.set_grid(grid)
+# =========================================================================
+# MISSION SOURCES
+# =========================================================================
 
-    # 2. Setup Blocks (Optional, for visualization/collision)
-    block_manager = BlockManager.BlockManager()
-    block_manager.add_block("cube1", BlockManager.Block(7, 7, 1, 1))
-    robot.set_block_manager(block_manager)
+def add_search_stats(stats, phases):
+    """Add one mission's per-phase SearchStats dicts to the run's stats["search"] totals."""
+    for phase, phase_stats in phases.items():
+        totals = stats["search"].setdefault(phase, {})
+        for key, value in phase_stats.items():
+            if key != "phase":
+                totals[key] = max(totals.get(key, 0), value) if key == "peak_open" else totals.get(key, 0) + value
+
+
+def stream_structure(planner, scenario, grid, block_manager, stats, verbose=True, time_budget=None):
+    """
+    Stream every block move of the scenario plan, segment by segment.
+    Every segment is validated before it is handed out; a mission stops at
+    its first invalid segment. Planning time is accumulated in stats["plan_ms"],
+    search statistics per phase in stats["search"].
+    time_budget: anytime refinement per segment (see PathPlanner.stream_mission).
+    """
+    robot_pos, robot_angle = scenario.robot_start, scenario.robot_angle
+    positions = None    # Block positions according to the validated commands
+
+    for block_name, goal in scenario.plan:
+        block = block_manager.get_block(block_name)
+        start = (int(block.x), int(block.y))
+
+        def latest_world(block_name=block_name, goal=goal):
+            return planning_overlay(grid, block_manager, block_name, goal)
+
+        # Blocks that are not on their goal yet must not get frozen by this one
+        goals = dict(scenario.plan)
+        pending = []
+        for other_name, other in block_manager.blocks.items():
+            cell = (int(other.x), int(other.y))
+            if other_name != block_name and other_name in goals and cell != goals[other_name]:
+                pending.append(cell)
+
+        search_stats = {}
+        segments = planner.stream_mission(robot_pos, robot_angle, start, goal, world=latest_world,
+                                          pending=pending, time_budget=time_budget, stats=search_stats)
+        ok = True
+        seg_pos, seg_angle = robot_pos, robot_angle
+        while True:
+            t0 = time.perf_counter()
+            segment = next(segments, None)
+            stats["plan_ms"] += (time.perf_counter() - t0) * 1000
+            if segment is None:
+                break
+            if verbose:
+                print(f"{block_name}: {segment}")
+            if segment.phase == "failed":
+                ok = False
+                break
+
+            check = validate_commands(grid, block_manager, seg_pos, seg_angle, segment.commands, positions)
+            if not check.ok:
+                print(f"{block_name}: rejected, {check.summary()}")
+                ok = False
+                break
+            positions = check.blocks
+            seg_pos, seg_angle = segment.robot_pos, segment.robot_angle
+            yield segment
+
+        segments.close()
+        add_search_stats(stats, {phase: s.as_dict() for phase, s in search_stats.items()})
+
+        # Update the world logically (the real robot can't report it): the
+        # segments handed out so far are executed, even if the mission failed
+        robot_pos, robot_angle = seg_pos, seg_angle
+        if positions is not None:
+            block_manager.set_block_position(block_name, *positions[block_name])
+
+        if ok:
+            stats["missions"] += 1
+        else:
+            stats["failed"] += 1
+
+
+def batch_structure(planner, scenario, grid, block_manager, stats, verbose=True, time_budget=None):
+    """
+    Plan the whole scenario up front with plan_missions(); missions are validated in order.
+    Blocks outside the plan are obstacles; a block planned twice starts its
+    second move where the first one leaves it.
+    time_budget: anytime refinement per mission, spent before the first command (see PathPlanner.plan_mission).
+    """
+    current = dict(scenario.blocks)
+    jobs = []
+    for name, goal in scenario.plan:
+        jobs.append((current[name], goal))
+        current[name] = goal
+    planned = {name for name, _ in scenario.plan}
+    obstacles = [cell for name, cell in scenario.blocks.items() if name not in planned]
+
+    t0 = time.perf_counter()
+    results = planner.plan_missions(jobs, scenario.robot_start, scenario.robot_angle, grid=grid,
+                                    time_budget=time_budget, obstacles=obstacles)
+    stats["plan_ms"] += (time.perf_counter() - t0) * 1000
+
+    robot_pos, robot_angle = scenario.robot_start, scenario.robot_angle
+    positions = None
+    for (block_name, _), result in zip(scenario.plan, results):
+        if verbose:
+            print(f"{block_name}: {result.summary()}")
+        add_search_stats(stats, result.stats_dict())
+
+        if not result.ok:
+            stats["failed"] += 1
+            continue
+
+        check = validate_commands(grid, block_manager, robot_pos, robot_angle, result.commands, positions)
+        if not check.ok:
+            print(f"{block_name}: rejected, {check.summary()}")
+            stats["failed"] += 1
+            continue
+        robot_pos, robot_angle, positions = check.robot_pos, check.robot_angle, check.blocks
+
+        stats["missions"] += 1
+        yield result.commands
 
-    # 3. Initialize Planner
-    planner = PathPlanner(grid)
+
+# =========================================================================
+# RUNNER
+# =========================================================================
+
+def run_scenario(scenario, robot_future, args, run_start, run_log=None):
+    """
+    Plan and execute one scenario unattended; returns its timing stats.
+    run_log: optional RunLogWriter; every executed command is recorded with
+    the world state after it (the backend's own, or a headless shadow's for
+    the real robot, which can't report it).
+    With args.shared_world, that world state is also published to a
+    SharedWorldState of that name after every command (see Simulator.World_Viewer).
+    """
+    stats = {
+        "scenario": scenario.name,
+        "backend": args.backend,
+        "mode": args.mode,
+        "plan_ms": 0.0,
+        "first_command_ms": None,
+        "exec_s": 0.0,
+        "commands": 0,
+        "missions": 0,
+        "failed": 0,
+        "search": {},       # phase -> summed SearchStats counters
+    }
+
+    grid = scenario.build_grid()
+    block_manager = scenario.build_block_manager()
+    planner = PathPlanner(grid, flat_search=args.flat_search)
     action_queue = ActionQueue()
 
-    # 4. Define Mission
-    # Ensure these match where your robot actually is!
-    robot_start = (0, 0)
-    robot_angle = 0  # 0=East
+    source = stream_structure if args.mode == "stream" else batch_structure
+    time_budget = args.time_budget_ms / 1000 if args.time_budget_ms is not None else None
+    action_queue.set_source(source(planner, scenario, grid, block_manager, stats, verbose=not args.quiet,
+                                   time_budget=time_budget))
+
+    # Plan the first segment now, concurrently with the robot start-up
+    action_queue.peek()
+
+    robot = robot_future.result()
+    robot.set_grid(grid)
+    robot.set_block_manager(block_manager)
+    if hasattr(robot, "set_grid_pose"):
+        robot.set_grid_pose(scenario.robot_start, scenario.robot_angle)
+
+    world = None
+    if args.shared_world:
+        from Environment.World_State import SharedWorldState
+        world = SharedWorldState.from_world(grid, block_manager, scenario.robot_start, scenario.robot_angle,
+                                            name=args.shared_world)
+        print(f"Shared world: {world.name} (watch with: python -m Simulator.World_Viewer {world.name})")
+
+    try:
+        tracker = None
+        if run_log is not None or world is not None:
+            tracker = robot
+            if not hasattr(robot, "world_state"):
+                from Simulator.Thymio_Headless import HeadlessThymio
+                tracker = HeadlessThymio()
+                tracker.set_grid(grid)
+                tracker.set_block_manager(scenario.build_block_manager())
+                tracker.set_grid_pose(scenario.robot_start, scenario.robot_angle)
+            block_names = list(scenario.blocks)
+        if run_log is not None:
+            meta = dict(scenario.to_dict(), backend=args.backend, mode=args.mode)
+            run_log.start_run(meta)
+
+        # --------------------- GAME LOOP ------------------------
+        move_delay = args.move_delay
+        frame_time = 1 / 60 if args.backend == "sim" or move_delay > 0 else 0.0
+        last_move_time = None
+        exec_start = None
+        last_frame = time.perf_counter()
+
+        while True:
+            now = time.perf_counter()
+            dt = now - last_frame
+            last_frame = now
+
+            # Automated Movement Logic
+            if last_move_time is None or now - last_move_time >= move_delay:
+                if action_queue.has_next():
+                    action = action_queue.next()
+
+                    if stats["first_command_ms"] is None:
+                        # The real robot can't send anything before it is connected
+                        if hasattr(robot, "wait_connected"):
+                            robot.wait_connected()
+                        exec_start = time.perf_counter()
+                        stats["first_command_ms"] = (exec_start - run_start) * 1000
+
+                    if not args.quiet:
+                        print(f"Executing: {action}")
+                    execute_action(robot, action)
+                    stats["commands"] += 1
+                    last_move_time = now
+
+                    if tracker is not None:
+                        if tracker is not robot:
+                            tracker.execute(action)
+                        pos, angle, blocks = tracker.world_state()
+                        if run_log is not None:
+                            run_log.log(time.perf_counter() - exec_start, action, pos, angle,
+                                        [blocks[name] for name in block_names])
+                        if world is not None:
+                            world.publish(pos, angle, blocks)
+
+                elif not args.keep_open:
+                    break
+
+            # Update Simulator Display
+            robot.update(dt)
+
+            if frame_time:
+                time.sleep(max(0.0, frame_time - (time.perf_counter() - now)))
+
+        if exec_start is not None:
+            stats["exec_s"] = time.perf_counter() - exec_start
+    finally:
+        if world is not None:
+            world.unlink()
+            world.close()
+    return stats
+
+
+def format_stats(stats):
+    first = stats["first_command_ms"]
+    first = f"{first:.1f} ms" if first is not None else "-"
+    return (f"[{stats['scenario']}] {stats['missions']} ok / {stats['failed']} failed, "
+            f"{stats['commands']} commands, plan {stats['plan_ms']:.1f} ms, "
+            f"first command {first}, exec {stats['exec_s']:.2f} s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Thymio block builder")
+    parser.add_argument("--scenario", action="append", default=None,
+                        help="scenario file (.json/.yaml), may be repeated (default: scenarios/default.json)")
+    parser.add_argument("--backend", choices=BACKENDS, default="sim",
+                        help="robot backend (default: sim)")
+    parser.add_argument("--mode", choices=("stream", "batch"), default="stream",
+                        help="stream segments while driving, or plan every mission up front")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="run every scenario this many times")
+    parser.add_argument("--move-delay", type=float, default=None,
+                        help="seconds between commands (default: 0.5, 0 for headless)")
+    parser.add_argument("--keep-open", action="store_true",
+                        help="keep the control loop (and sim window) running after the last command")
+    parser.add_argument("--quiet", action="store_true",
+                        help="only print the timing summary")
+    parser.add_argument("--stats-json", default=None,
+                        help="write per-run timing stats to this file")
+    parser.add_argument("--time-budget-ms", type=float, default=None,
+                        help="anytime planning: start from a quick weighted path and refine it for this long "
+                             "(stream mode refines while the robot drives, batch mode before it starts)")
+    parser.add_argument("--run-log", default=None,
+                        help="append a binary log of every executed command to this file")
+    parser.add_argument("--replay", default=None,
+                        help="replay a run log on the sim/headless backend and diff it against the log")
+    parser.add_argument("--replay-speed", type=float, default=None,
+                        help="replay speed (1.0 = recorded timing; default: as fast as possible)")
+    parser.add_argument("--flat-search", action="store_true",
+                        help="use the array-based search core (for very large arenas)")
+    parser.add_argument("--shared-world", default=None, metavar="NAME",
+                        help="publish the world state to this shared memory segment for other processes")
+    parser.add_argument("--first-command-budget-ms", type=float, default=None,
+                        help="exit with status 1 if any run sends its first command later than this")
+    args = parser.parse_args(argv)
 
-    block_start = (0,4)  # Where the block is now
-    block_goal = (0,5)  # Where you want it to go
+    if args.move_delay is None:
+        args.move_delay = 0.0 if args.backend == "headless" else 0.5
+    if not args.scenario:
+        args.scenario = [DEFAULT_SCENARIO]
+    return args
 
-    # 5. Generate ALL commands
-    print(f"Generating mission from {block_start} to {block_goal}...")
-    mission_queue = planner.generate_mission(robot_start, robot_angle, block_start, block_goal)
 
-    # 6. Add to ActionQueue
-    for cmd in mission_queue:
-        action_queue.add(cmd)
+def replay_log(args):
+    """Re-execute every run of a log on the simulator; exit status 1 if any diverges."""
+    if args.backend == "real":
+        print("Replay needs the sim or headless backend")
+        return 2
+    exit_code = 0
+    for run in read_run_log(args.replay):
+        robot = create_robot(args.backend)
+        report = robot.replay(run, speed=args.replay_speed)
+        print(report.summary())
+        if not report.ok:
+            exit_code = 1
+    return exit_code
 
-    print("Final Command Queue:")
-    action_queue.print_queue()
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.replay:
+        return replay_log(args)
+    scenarios = [Scenario.load(path) for path in args.scenario]
 
+    # Bring the robot up (import + connect) while the first run plans
+    pool = ThreadPoolExecutor(max_workers=1)
+    robot_future = pool.submit(create_robot, args.backend)
+    run_log = RunLogWriter(args.run_log) if args.run_log else None
 
-    # --------------------- GAME LOOP ------------------------
-    last_move_time = pg.time.get_ticks()
-    move_delay = 500  # 0.5 seconds per move
+    all_stats = []
+    run_start = START_TIME
+    try:
+        for _ in range(args.repeat):
+            for scenario in scenarios:
+                stats = run_scenario(scenario, robot_future, args, run_start, run_log)
+                all_stats.append(stats)
+                print(format_stats(stats))
+                run_start = time.perf_counter()
+    finally:
+        if run_log is not None:
+            run_log.close()
 
-    while True:
-        # Handle Pygame Events
-        dt = clock.tick(60) / 1000.0
-        for event in pg.event.get():
-            if event.type == pg.QUIT:
-                pg.quit()
-                sys.exit()
+    pool.shutdown(wait=False)
 
-        # Automated Movement Logic
-        current_time = pg.time.get_ticks()
-        if current_time - last_move_time > move_delay:
-            if action_queue.has_next():
-                action = action_queue.next()
-                print(f"Executing: {action}")
+    if args.stats_json:
+        with open(args.stats_json, "w") as f:
+            json.dump(all_stats, f, indent=2)
 
-                if action == "F":
-                    robot.move_forward()
-                elif action == "B":
-                    robot.move_backward()
-                elif action == "TR":
-                    robot.rotate_right()
-                elif action == "TL":
-                    robot.rotate_left()
-                elif action == "PB":
-                    robot.find_block()
-                else:
-                    print(f"Unknown action: {action}")
-                last_move_time = current_time
+    exit_code = 0
+    if any(s["failed"] for s in all_stats):
+        exit_code = 1
 
-        # Update Simulator Display
-        robot.update(dt)
+    budget = args.first_command_budget_ms
+    if budget is not None:
+        late = [s for s in all_stats if s["first_command_ms"] is not None and s["first_command_ms"] > budget]
+        if late:
+            print(f"First command budget of {budget:.1f} ms missed in {len(late)} run(s)")
+            exit_code = 1
+    return exit_code
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
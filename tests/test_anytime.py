@@ -0,0 +1,20 @@
+from Environment.Grid_Map import GridMap
+from PathPlanner import PathPlanner
+
+
+def test_plan_mission_refines_inline_up_to_the_optimum():
+    planner = PathPlanner(GridMap(12, 12))
+    refined = planner.plan_mission((0, 0), 0, (2, 2), (9, 9), time_budget=5.0)
+    optimal = planner.plan_mission((0, 0), 0, (2, 2), (9, 9))
+    assert refined.ok and refined.stats["block_path"].searches > 1
+    # Stops once the last round is optimal, long before the budget
+    assert refined.stats["block_path"].time_s < 5.0
+    assert planner.block_path_cost(refined.block_path, None) == planner.block_path_cost(optimal.block_path, None)
+
+
+def test_stream_mission_refines_in_the_background():
+    planner = PathPlanner(GridMap(12, 12))
+    stats = {}
+    segments = list(planner.stream_mission((0, 0), 0, (2, 2), (9, 9), time_budget=0.05, stats=stats))
+    assert segments[-1].block_pos == (9, 9)
+    assert stats["refine"].searches >= 1 and stats["refine"].time_s > 0
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from Environment.Block_Manager import Block, BlockManager
+from Environment.Command_Validator import validate_commands
+from Environment.Grid_Map import BLOCKED, FREE, GridMap
+from Simulator.Thymio_Headless import HeadlessThymio
+
+COMMANDS = ["F", "F", "F", "B", "TR", "TL", "PB", "AB", "HB", "HF"]
+
+
+def random_world(seed):
+    rng = random.Random(seed)
+    grid = GridMap(8, 8)
+    for _ in range(8):
+        grid.set_cell(rng.randrange(8), rng.randrange(8), BLOCKED)
+    free = [(x, y) for x in range(8) for y in range(8) if grid.get_cell(x, y) == FREE]
+    rng.shuffle(free)
+    blocks = {f"b{i}": free[i] for i in range(4)}
+    return grid, blocks, free[4], rng.choice([0, 90, 180, 270])
+
+
+def block_manager(blocks):
+    manager = BlockManager()
+    for name, (x, y) in blocks.items():
+        manager.add_block(name, Block(x, y, 1, 1))
+    return manager
+
+
+def random_commands(grid, blocks, robot, angle, rng, count=40):
+    """count commands that validate, built one at a time, then one random (maybe invalid) last command."""
+    commands = []
+    while len(commands) < count:
+        command = rng.choice(COMMANDS)
+        if validate_commands(grid, block_manager(blocks), robot, angle, commands + [command]).ok:
+            commands.append(command)
+    return commands + [rng.choice(COMMANDS)]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_valid_commands_simulate_to_the_same_world(seed):
+    grid, blocks, robot, angle = random_world(seed)
+    commands = random_commands(grid, blocks, robot, angle, random.Random(seed + 1000))
+
+    result = validate_commands(grid, block_manager(blocks), robot, angle, commands)
+    valid = commands if result.ok else commands[:result.step]
+    assert len(valid) >= len(commands) - 1
+
+    sim = HeadlessThymio()
+    sim.set_grid(grid)
+    sim.set_block_manager(block_manager(blocks))
+    sim.set_grid_pose(robot, angle)
+    for command in valid:
+        assert sim.execute(command)
+    assert sim.world_state() == (result.robot_pos, result.robot_angle, result.blocks)
+
+
+def test_reports_the_first_failing_command():
+    grid = GridMap(5, 5)
+    grid.set_cell(3, 2, BLOCKED)
+    blocks = block_manager({"a": (2, 2)})
+    result = validate_commands(grid, blocks, (0, 2), 0, ["F", "F", "TL"])
+    assert not result.ok and (result.step, result.command) == (1, "F")
+    assert "blocked by an obstacle at (3, 2)" in result.reason
+    assert result.robot_pos == (1, 2) and result.blocks == {"a": (2, 2)}
+    assert (blocks.get_block("a").x, blocks.get_block("a").y) == (2, 2)     # Nothing touched
+
+
+@pytest.mark.parametrize("command, cell", [("B", (1, 2)), ("F", (3, 2))])
+def test_rejects_what_the_simulator_lets_through(command, cell):
+    # The simulator pushes the block behind on B and drives into the wall on F
+    grid = GridMap(5, 5)
+    grid.set_cell(3, 2, BLOCKED)
+    blocks = {"a": (1, 2)}
+    assert not validate_commands(grid, block_manager(blocks), (2, 2), 0, [command]).ok
+
+    sim = HeadlessThymio()
+    sim.set_grid(grid)
+    sim.set_block_manager(block_manager(blocks))
+    sim.set_grid_pose((2, 2), 0)
+    sim.execute(command)
+    assert sim.world_state()[0] == cell
+
+
+def test_half_moves_only_come_back_to_back():
+    grid = GridMap(5, 5)
+    blocks = block_manager({})
+    assert validate_commands(grid, blocks, (2, 2), 0, ["HB", "HF", "TL"]).ok
+    result = validate_commands(grid, blocks, (2, 2), 0, ["HB", "TL", "HF"])
+    assert not result.ok and (result.step, result.command) == (1, "TL")
+    assert not validate_commands(grid, blocks, (2, 2), 0, ["HF"]).ok
+
+
+def test_chains_block_positions_of_a_previous_result():
+    grid = GridMap(6, 3)
+    blocks = block_manager({"a": (1, 1)})
+    first = validate_commands(grid, blocks, (0, 1), 0, ["F", "F"])
+    second = validate_commands(grid, blocks, first.robot_pos, first.robot_angle, ["F"], first.blocks)
+    assert second.ok and second.blocks == {"a": (4, 1)}
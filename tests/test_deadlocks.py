@@ -0,0 +1,61 @@
+import threading
+
+from Environment.Deadlocks import live_squares, make_pruner
+from Environment.Grid_Map import BLOCKED, GridMap
+from PathPlanner import PathPlanner
+
+
+def wall_arena():
+    """5x6 arena, column x=0 blocked, one obstacle at (3, 3)."""
+    grid = GridMap(5, 6)
+    for y in range(6):
+        grid.set_cell(0, y, 1)
+    grid.set_cell(3, 3, 1)
+    return grid
+
+
+def test_passing_a_pending_block_is_not_a_deadlock():
+    # (2, 2) freezes the pending block on (3, 2) only while the active block passes
+    results = PathPlanner(wall_arena()).plan_missions([((2, 1), (2, 4)), ((3, 2), (4, 2))], (1, 5), 270)
+    assert [r.ok for r in results] == [True, True]
+    assert results[0].block_path == [(2, 1), (2, 2), (2, 3), (2, 4)]
+
+
+def test_freezing_a_pending_block_counts_only_where_the_block_stays():
+    grid = wall_arena()
+    # A block on (2, 2) leaves (3, 2) no free axis ((3, 3) is an obstacle)
+    assert make_pruner(grid, (2, 2), pending=[(3, 2)])((2, 2))         # Stays there: its goal
+    assert not make_pruner(grid, (2, 4), pending=[(3, 2)])((2, 2))     # Only passes by
+    # Mutual freeze: with (2, 3) blocked the two blocks pin each other
+    grid.set_cell(2, 3, 1)
+    assert make_pruner(grid, (4, 2), pending=[(3, 2)])((2, 2))
+
+
+def test_dead_squares_are_pruned():
+    grid = GridMap(5, 5)
+    prune = make_pruner(grid, (2, 2))
+    assert prune((0, 0))        # Corner: can never be pushed out again
+    assert not prune((2, 3))
+
+
+def test_live_squares_are_not_cached_across_a_concurrent_change():
+    # While one thread builds the table, the arena changes and another thread queries it
+    class PausingGrid(GridMap):
+        pause = None
+
+        def get_cell(self, x, y):
+            if (x, y) == (20, 0) and threading.current_thread() is self.pause:      # After (15, 13)
+                self.pause = None
+                self.set_cell(15, 13, BLOCKED)
+                other = threading.Thread(target=live_squares, args=(self, (15, 15)))
+                other.start()
+                other.join(0.2)     # Finishes at once unless the table is locked
+            return super().get_cell(x, y)
+
+    grid = PausingGrid(30, 30)
+    blocked = GridMap(30, 30)
+    blocked.set_cell(15, 13, BLOCKED)
+    expected = live_squares(blocked, (15, 15))
+    grid.pause = threading.current_thread()
+    live_squares(grid, (15, 15))
+    assert live_squares(grid, (15, 15)) == expected
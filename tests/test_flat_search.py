@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from Environment.Flat_Search import FlatGridSearch, flat_astar
+from Environment.Grid_Map import BLOCKED, FREE, GridMap
+from Environment.a_star import astar, path_cost
+from PathPlanner import PathPlanner
+
+# Both cores key their states by cell only, so with turn penalties the path
+# found depends on expansion order (see FlatGridSearch.search). Without
+# them A* is exact, and the two must agree on the cost.
+
+
+def random_arena(size, density, seed):
+    rng = random.Random(seed)
+    grid = GridMap(size, size)
+    for _ in range(int(size * size * density)):
+        grid.set_cell(rng.randrange(size), rng.randrange(size), BLOCKED)
+    return grid
+
+
+def free_cells(grid, count, seed):
+    rng = random.Random(seed)
+    cells = [(x, y) for x in range(grid.width_cells) for y in range(grid.height_cells) if grid.get_cell(x, y) == FREE]
+    return [rng.choice(cells) for _ in range(count)]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_robot_paths_cost_the_same(seed):
+    grid = random_arena(30, 0.25, seed)
+    cells = free_cells(grid, 20, seed + 100)
+    for start, goal in zip(cells[::2], cells[1::2]):
+        expected = astar(grid, start, goal, turn_penalty=0)
+        path = flat_astar(grid, start, goal, turn_penalty=0)
+        assert bool(path) == bool(expected)
+        if path:
+            assert (path[0], path[-1]) == (start, goal)
+            assert path_cost(path, 0) == path_cost(expected, 0)
+            assert all(grid.get_cell(x, y) == FREE for x, y in path)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_block_paths_cost_the_same(seed):
+    grid = GridMap(20, 20)
+    dict_planner = PathPlanner(grid)
+    flat_planner = PathPlanner(grid, flat_search=True)
+    rng = random.Random(seed)
+    for _ in range(10):
+        start = (rng.randrange(2, 18), rng.randrange(2, 18))
+        goal = (rng.randrange(2, 18), rng.randrange(2, 18))
+        expected = dict_planner.get_weighted_block_path(start, goal, turn_penalty=0)
+        path = flat_planner.get_weighted_block_path(start, goal, turn_penalty=0)
+        assert len(path) == len(expected)
+
+
+def test_overlays_are_patched_for_one_query_only():
+    grid = GridMap(10, 10)
+    searcher = FlatGridSearch(grid)
+    wall = [(5, y) for y in range(10)]
+    assert searcher.search(grid.overlay(blocked=wall), (0, 0), (9, 9)) == []
+    assert searcher.search(grid, (0, 0), (9, 9)) != []
+    assert all(searcher.passable)
+
+
+def test_searcher_follows_grid_changes():
+    grid = GridMap(10, 10)
+    searcher = FlatGridSearch(grid)
+    assert searcher.search(grid, (0, 0), (9, 0))
+    for y in range(10):
+        grid.set_cell(5, y, BLOCKED)
+    assert searcher.search(grid, (0, 0), (9, 0)) == []
@@ -0,0 +1,39 @@
+import pickle
+
+from Environment.Grid_Map import BLOCKED, FREE, GridMap
+
+
+def test_overlays_leave_the_grid_alone():
+    grid = GridMap(6, 6)
+    grid.set_cell(2, 2, BLOCKED)
+    version = grid.version
+    view = grid.overlay(blocked=[(1, 1), (3, 3)], free=[(2, 2), (3, 3)])
+    assert view.get_cell(1, 1) == BLOCKED
+    assert view.get_cell(2, 2) == FREE and view.get_cell(3, 3) == FREE     # free wins
+    assert grid.get_cell(1, 1) == FREE and grid.get_cell(2, 2) == BLOCKED
+    assert grid.version == version
+
+    stacked = view.overlay(blocked=[(2, 2)])
+    assert stacked.get_cell(2, 2) == BLOCKED and stacked.get_cell(1, 1) == BLOCKED
+    assert view.get_cell(2, 2) == FREE
+
+
+def test_connectivity_follows_overlays_and_changes():
+    grid = GridMap(7, 3)
+    for y in range(3):
+        grid.set_cell(3, y, BLOCKED)
+    assert not grid.connected((0, 0), (6, 0))
+    assert grid.overlay(free=[(3, 1)]).connected((0, 0), (6, 0))
+    # Extra blocked cells don't split components: connected() stays a safe "maybe"
+    assert grid.overlay(free=[(3, 1)], blocked=[(2, 0), (2, 1), (2, 2)]).connected((0, 0), (6, 0))
+    grid.set_cell(3, 2, FREE)
+    assert grid.connected((0, 0), (6, 0))
+
+
+def test_snapshots_are_frozen_copies():
+    grid = GridMap(4, 4)
+    snapshot = grid.snapshot()
+    grid.set_cell(1, 1, BLOCKED)
+    copy = pickle.loads(pickle.dumps(snapshot))
+    assert snapshot.get_cell(1, 1) == FREE and copy.get_cell(1, 1) == FREE
+    assert copy.connected((0, 0), (3, 3))
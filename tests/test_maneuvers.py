@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from Environment.Grid_Map import GridMap
+from Environment.Maneuvers import NONE, ROUTES, ManeuverLibrary, footprint
+from Environment.Command_Validator import validate_commands
+from Environment.Block_Manager import Block, BlockManager
+
+
+def test_wide_loop_only_sweeps_the_cell_beside_the_robot():
+    cells, end, angle = footprint(ROUTES["wide_loop"])
+    assert (0, -1) in cells and (end, angle) == ((1, -1), 90)
+
+
+def test_no_maneuver_turns_between_half_moves():
+    # A turn between HB and HF would leave the robot half a cell off in both axes
+    assert all("HB" not in m.commands for m in ManeuverLibrary().maneuvers)
+    with pytest.raises(ValueError):
+        footprint(["HB", "TL", "HF"])
+
+
+def test_table_picks_the_fastest_maneuver_that_fits():
+    library = ManeuverLibrary()
+    bit = {cell: 1 << i for i, cell in enumerate(library.cells)}
+    rng = random.Random(3)
+    for _ in range(2000):
+        mask = rng.randrange(len(library.table))
+        blocked = {cell for cell, b in bit.items() if mask & b}
+        fits = [i for i, m in enumerate(library.maneuvers) if not (m.cells & blocked)]
+        assert library.table[mask] == (fits[0] if fits else NONE)
+
+
+def test_chosen_maneuver_redocks_behind_the_block_in_every_orientation():
+    library = ManeuverLibrary()
+    grid = GridMap(9, 9)
+    grid.set_cell(3, 3, 1)      # Something next to every turn to make it pick
+    for vec_in in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        for vec_out in ((vec_in[1], vec_in[0]), (-vec_in[1], -vec_in[0])):
+            block = (4, 4)
+            robot = (block[0] - vec_in[0], block[1] - vec_in[1])
+            angle = {(1, 0): 0, (0, 1): 90, (-1, 0): 180, (0, -1): 270}[vec_in]
+            _, commands = library.choose(grid, block, vec_in, vec_out)
+
+            blocks = BlockManager()
+            blocks.add_block("b", Block(*block, 1, 1))
+            check = validate_commands(grid, blocks, robot, angle, commands)
+            assert check.ok, check.summary()
+            assert check.robot_pos == (block[0] - vec_out[0], block[1] - vec_out[1])
+            assert check.robot_angle == {(1, 0): 0, (0, 1): 90, (-1, 0): 180, (0, -1): 270}[vec_out]
+            assert check.blocks["b"] == block
+
+
+def test_reversing_has_no_maneuver():
+    assert ManeuverLibrary().choose(GridMap(9, 9), (4, 4), (1, 0), (-1, 0)) is None
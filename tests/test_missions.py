@@ -0,0 +1,33 @@
+from Environment.Block_Manager import Block, BlockManager
+from Environment.Command_Validator import validate_commands
+from Environment.Grid_Map import GridMap
+from PathPlanner import PathPlanner
+
+
+def test_plan_missions_routes_around_obstacles():
+    grid = GridMap(10, 7)
+    result, = PathPlanner(grid).plan_missions([((1, 3), (8, 3))], (0, 3), 0, obstacles=[(5, 3)])
+    assert result.ok and (5, 3) not in result.block_path
+
+    blocks = BlockManager()
+    blocks.add_block("a", Block(1, 3, 1, 1))
+    blocks.add_block("wall", Block(5, 3, 1, 1))
+    check = validate_commands(grid, blocks, (0, 3), 0, result.commands)
+    assert check.ok and check.blocks == {"a": (8, 3), "wall": (5, 3)}
+
+
+def test_generate_mission_is_quiet_by_default(capsys):
+    commands = PathPlanner(GridMap(6, 3)).generate_mission((0, 1), 0, (1, 1), (4, 1))
+    assert commands and capsys.readouterr().out == ""
+
+
+def test_plan_missions_chains_moves_of_the_same_block():
+    grid = GridMap(10, 7)
+    grid.set_cell(4, 0, 1)
+    planner = PathPlanner(grid)
+    first, second = planner.plan_missions([((1, 3), (4, 3)), ((4, 3), (8, 3))], (0, 3), 0)
+    assert first.ok and second.ok and second.block_path[0] == (4, 3)
+
+    # The second move can't start from a cell the first one never reached
+    first, second = planner.plan_missions([((1, 3), (4, 0)), ((4, 0), (8, 3))], (0, 3), 0)
+    assert not first.ok and not second.ok and "earlier move failed" in second.reason
@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+from Environment.Grid_Map import GridMap
+from PlanningService import MissionRequest, PlanningService
+
+
+def test_plans_requests_in_batches():
+    with PlanningService(workers=2, batch_size=4) as service:
+        service.register_arena("default", GridMap(8, 8))
+        results = service.plan_many([MissionRequest((0, 0), 0, (2, 2), (5, 2 + i)) for i in range(4)])
+    assert all(r.ok for r in results)
+    assert [r.block_goal for r in results] == [(5, 2), (5, 3), (5, 4), (5, 5)]
+
+
+def test_submit_racing_shutdown_never_leaves_a_future_pending():
+    for _ in range(20):
+        service = PlanningService(workers=2)
+        service.register_arena("default", GridMap(8, 8))
+        futures = []
+        refused = []
+
+        def client():
+            for _ in range(50):
+                try:
+                    futures.append(service.submit(MissionRequest((0, 0), 0, (2, 2), (5, 5))))
+                except RuntimeError:
+                    refused.append(1)
+                    return
+
+        clients = [threading.Thread(target=client) for _ in range(4)]
+        for c in clients:
+            c.start()
+        service.shutdown()
+        for c in clients:
+            c.join()
+        for f in futures:
+            assert f.result(timeout=5).ok
+
+
+def test_submit_after_shutdown_is_refused():
+    service = PlanningService(workers=1)
+    service.register_arena("default", GridMap(8, 8))
+    service.shutdown()
+    with pytest.raises(RuntimeError):
+        service.submit(MissionRequest((0, 0), 0, (2, 2), (5, 5)))
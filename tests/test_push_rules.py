@@ -0,0 +1,17 @@
+from Environment.Grid_Map import BLOCKED, GridMap
+from Environment.Push_Rules import check_mission_feasible
+from PathPlanner import PathPlanner
+
+
+def test_impossible_missions_fail_before_any_search():
+    grid = GridMap(7, 7)
+    for y in range(7):
+        grid.set_cell(3, y, BLOCKED)
+    assert check_mission_feasible(grid, (0, 0), (1, 3), (5, 3)) == "goal not connected to block"
+    assert check_mission_feasible(grid, (6, 0), (1, 3), (1, 5)) == "robot cannot reach the block"
+    assert check_mission_feasible(grid, (0, 1), (0, 0), (0, 3)) == "block cannot be pushed from its start cell"
+    assert check_mission_feasible(grid, (0, 0), (1, 3), (1, 5)) is None
+
+    result = PathPlanner(grid).plan_mission((0, 0), 0, (1, 3), (5, 3))
+    assert not result.ok and result.reason == "goal not connected to block"
+    assert result.stats["checks"].searches == 0 and "block_path" not in result.stats
@@ -0,0 +1,14 @@
+import pytest
+
+from Core.Thymio_Interface import RobotInterface
+from Simulator.Thymio_Headless import HeadlessThymio
+
+
+@pytest.mark.parametrize("command", ["align_block", "half_back", "half_forward"])
+def test_backends_must_implement_every_command(command):
+    # A backend missing one would only fail once the planner sent that command
+    methods = {name: lambda self: None for name in RobotInterface.__abstractmethods__ if name != command}
+    backend = type("PartialBackend", (RobotInterface,), methods)
+    with pytest.raises(TypeError):
+        backend()
+    assert HeadlessThymio().execute({"align_block": "AB", "half_back": "HB", "half_forward": "HF"}[command])
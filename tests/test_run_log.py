@@ -0,0 +1,65 @@
+import os
+import time
+from concurrent.futures import Future
+
+import main
+from Core.Run_Log import MAGIC, RunLogWriter, read_run_log
+from Environment.Scenario import Scenario
+from Simulator.Thymio_Headless import HeadlessThymio
+
+STRUCTURE = os.path.join(os.path.dirname(main.DEFAULT_SCENARIO), "structure.json")
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "run.log")
+    with RunLogWriter(path) as log:
+        log.start_run({"name": "a", "blocks": {"b1": [1, 1], "b2": [3, 3]}})
+        log.log(0.5, "F", (2, 1), 0, [(3, 1), (3, 3)])
+        log.log(1.25, "TL", (2, 1), 270, [(3, 1), (3, 3)])
+        log.start_run({"name": "b", "blocks": {}})
+        log.log(0.0, "HB", (-1, 4), 90, [])
+
+    runs = read_run_log(path)
+    assert [r.meta["name"] for r in runs] == ["a", "b"]
+    assert [(e.t, e.action, e.robot_pos, e.robot_angle, e.blocks) for e in runs[0].events] == [
+        (0.5, "F", (2, 1), 0, {"b1": (3, 1), "b2": (3, 3)}),
+        (1.25, "TL", (2, 1), 270, {"b1": (3, 1), "b2": (3, 3)}),
+    ]
+    assert [(e.action, e.robot_pos, e.robot_angle) for e in runs[1].events] == [("HB", (-1, 4), 90)]
+
+
+def test_torn_record_is_dropped_and_appending_continues(tmp_path):
+    path = str(tmp_path / "run.log")
+    with RunLogWriter(path) as log:
+        log.start_run({"name": "a", "blocks": {}})
+        log.log(0.1, "F", (1, 0), 0, [])
+        log.log(0.2, "F", (2, 0), 0, [])
+    os.truncate(path, os.path.getsize(path) - 3)    # Crash in the middle of the last record
+
+    assert len(read_run_log(path)[0].events) == 1
+    with RunLogWriter(path) as log:
+        log.start_run({"name": "b", "blocks": {}})
+        log.log(0.3, "B", (0, 0), 0, [])
+    runs = read_run_log(path)
+    assert [len(r.events) for r in runs] == [1, 1]
+    with open(path, "rb") as f:
+        assert f.read().count(MAGIC) == 1
+
+
+def test_logged_run_replays_without_differences(tmp_path):
+    path = str(tmp_path / "run.log")
+    args = main.parse_args(["--backend", "headless", "--quiet", "--scenario", STRUCTURE])
+    robot_future = Future()
+    robot_future.set_result(HeadlessThymio())
+    with RunLogWriter(path) as log:
+        stats = main.run_scenario(Scenario.load(STRUCTURE), robot_future, args, time.perf_counter(), log)
+
+    run = read_run_log(path)[0]
+    assert len(run.events) == stats["commands"] > 0
+    report = HeadlessThymio().replay(run)
+    assert report.ok and report.steps == stats["commands"]
+
+    # A changed action is caught at its step
+    run.events[3].action = "TL" if run.events[3].action != "TL" else "TR"
+    report = HeadlessThymio().replay(run)
+    assert not report.ok and report.diffs[0][0] == 3
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+import main
+from Environment.Grid_Map import BLOCKED
+from Environment.Scenario import Scenario
+
+
+def test_loads_a_json_file_and_round_trips(tmp_path):
+    path = tmp_path / "small.json"
+    path.write_text(json.dumps({
+        "arena": {"width": 6, "height": 4, "obstacles": [[3, 3]]},
+        "blocks": {"a": [1, 1], "b": [2, 2]},
+        "plan": [["b", [4, 2]], ["a", [1, 2]]],
+    }))
+    scenario = Scenario.load(str(path))
+    assert scenario.name == "small" and scenario.robot_start == (0, 0)
+    assert scenario.plan == [("b", (4, 2)), ("a", (1, 2))]     # File order
+    assert scenario.build_grid().get_cell(3, 3) == BLOCKED
+    assert Scenario.from_dict(scenario.to_dict()).to_dict() == scenario.to_dict()
+
+
+def test_plan_must_name_known_blocks():
+    with pytest.raises(ValueError):
+        Scenario.from_dict({"arena": {"width": 3, "height": 3}, "plan": {"ghost": [1, 1]}})
+
+
+def test_cli_runs_every_scenario_and_reports_failures(tmp_path):
+    impossible = tmp_path / "walled.json"
+    impossible.write_text(json.dumps({
+        "arena": {"width": 5, "height": 5, "obstacles": [[2, y] for y in range(5)]},
+        "blocks": {"a": [1, 2]},
+        "plan": {"a": [3, 2]},
+    }))
+    stats_path = tmp_path / "stats.json"
+    code = main.main(["--backend", "headless", "--quiet", "--scenario", main.DEFAULT_SCENARIO,
+                      "--scenario", str(impossible), "--stats-json", str(stats_path)])
+    stats = json.loads(stats_path.read_text())
+    assert code == 1
+    assert [(s["scenario"], s["missions"], s["failed"]) for s in stats] == [("default", 1, 0), ("walled", 0, 1)]
+
+
+def run_modes(tmp_path, scenario, modes=("stream", "batch")):
+    """Run a scenario dict headless in each mode; returns {mode: (missions, failed)}."""
+    path = tmp_path / "scenario.json"
+    path.write_text(json.dumps(scenario))
+    results = {}
+    for mode in modes:
+        stats_path = tmp_path / f"{mode}.json"
+        main.main(["--backend", "headless", "--quiet", "--mode", mode, "--scenario", str(path),
+                   "--stats-json", str(stats_path)])
+        (stats,) = json.loads(stats_path.read_text())
+        results[mode] = (stats["missions"], stats["failed"])
+    return results
+
+
+def test_other_blocks_fill_one_cell(tmp_path):
+    # b sits beside the corridor a is pushed along: it must not block the cells around it
+    corridor = {
+        "arena": {"width": 10, "height": 3},
+        "blocks": {"a": [1, 1], "b": [5, 2]},
+        "plan": {"a": [8, 1]},
+    }
+    assert run_modes(tmp_path, corridor, modes=("stream",)) == {"stream": (1, 0)}
+
+
+def test_batch_avoids_blocks_outside_the_plan(tmp_path):
+    scenario = {
+        "arena": {"width": 10, "height": 7},
+        "robot": {"start": [0, 3], "angle": 0},
+        "blocks": {"a": [1, 3], "wall": [5, 3]},
+        "plan": {"a": [8, 3]},
+    }
+    assert run_modes(tmp_path, scenario) == {"stream": (1, 0), "batch": (1, 0)}
+
+
+def test_batch_chains_moves_of_the_same_block(tmp_path):
+    scenario = {
+        "arena": {"width": 10, "height": 7},
+        "robot": {"start": [0, 3], "angle": 0},
+        "blocks": {"a": [1, 3]},
+        "plan": [["a", [4, 3]], ["a", [8, 3]]],
+    }
+    assert run_modes(tmp_path, scenario) == {"stream": (2, 0), "batch": (2, 0)}
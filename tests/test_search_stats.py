@@ -0,0 +1,38 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import main
+from Environment.Grid_Map import GridMap
+from Environment.Scenario import Scenario
+from PathPlanner import PathPlanner
+from Simulator.Thymio_Headless import HeadlessThymio
+
+
+def test_plan_mission_reports_every_phase():
+    result = PathPlanner(GridMap(8, 8)).plan_mission((0, 0), 0, (2, 2), (5, 5))
+    assert result.ok
+    assert set(result.stats) == {"checks", "block_path", "approach", "transport"}
+    assert result.stats["block_path"].searches == 1 and result.stats["block_path"].expanded > 0
+
+
+def test_stream_mission_fills_the_stats_over_all_segments():
+    stats = {}
+    expanded = []
+    hooks = {"on_expand": lambda phase, cell, g: expanded.append(phase)}
+    segments = list(PathPlanner(GridMap(8, 8)).stream_mission((0, 0), 0, (2, 2), (5, 5), stats=stats, hooks=hooks))
+    assert segments[-1].phase == "transport" and segments[-1].block_pos == (5, 5)
+    assert stats["block_path"].searches == len(segments)     # Re-planned before every segment
+    assert stats["approach"].searches >= 1
+    assert expanded.count("block_path") == stats["block_path"].expanded
+
+
+@pytest.mark.parametrize("mode", ["stream", "batch"])
+def test_cli_reports_search_stats_in_both_modes(mode):
+    args = main.parse_args(["--backend", "headless", "--quiet", "--mode", mode])
+    robot_future = Future()
+    robot_future.set_result(HeadlessThymio())
+    stats = main.run_scenario(Scenario.load(main.DEFAULT_SCENARIO), robot_future, args, time.perf_counter())
+    assert stats["search"]["block_path"]["searches"] >= 1
+    assert stats["search"]["approach"]["expanded"] > 0
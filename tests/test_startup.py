@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future
+
+import main
+from Environment.Scenario import Scenario
+from PathPlanner import PathPlanner
+from Simulator.Thymio_Headless import HeadlessThymio
+
+STRUCTURE = os.path.join(os.path.dirname(main.DEFAULT_SCENARIO), "structure.json")
+
+
+class RecordingRobot(HeadlessThymio):
+    """Headless robot that notes how many segments were planned when its first command arrived."""
+
+    def __init__(self, planned):
+        super().__init__()
+        self.planned = planned
+        self.planned_at_first_command = None
+
+    def execute(self, action):
+        if self.planned_at_first_command is None:
+            self.planned_at_first_command = len(self.planned)
+        return super().execute(action)
+
+
+def test_first_command_goes_out_before_planning_and_connection_finish(monkeypatch):
+    planned = []
+    stream_mission = PathPlanner.stream_mission
+
+    def counting_stream_mission(self, *args, **kwargs):
+        for segment in stream_mission(self, *args, **kwargs):
+            planned.append(segment)
+            yield segment
+    monkeypatch.setattr(PathPlanner, "stream_mission", counting_stream_mission)
+
+    # The "connection" only completes once the first segment is planned
+    robot = RecordingRobot(planned)
+    robot_future = Future()
+    planned_before_connected = []
+
+    def connect():
+        deadline = time.perf_counter() + 5
+        while not planned and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        planned_before_connected.append(len(planned))
+        robot_future.set_result(robot)
+    threading.Thread(target=connect, daemon=True).start()
+
+    args = main.parse_args(["--backend", "headless", "--quiet", "--scenario", STRUCTURE])
+    stats = main.run_scenario(Scenario.load(STRUCTURE), robot_future, args, time.perf_counter())
+
+    assert planned_before_connected == [1]
+    assert robot.planned_at_first_command == 1
+    assert len(planned) > 1
+    assert stats["first_command_ms"] is not None
+    assert stats["missions"] == 4 and stats["failed"] == 0
+
+
+def fake_tdmclient(monkeypatch, connected, sent):
+    """Install a tdmclient whose connect() only returns once connected is set."""
+    class FakeNode:
+        async def send_event(self, name):
+            sent.append(name)
+
+    class FakeClient:
+        async def connect(self):
+            while not connected.is_set():
+                await asyncio.sleep(0.001)
+
+        async def wait_for_node(self):
+            return FakeNode()
+
+        async def wait_for_event(self, name, timeout=None):
+            return None
+
+    monkeypatch.setitem(sys.modules, "tdmclient", types.SimpleNamespace(ClientAsync=FakeClient))
+    monkeypatch.delitem(sys.modules, "Core.Thymio_Robot", raising=False)
+
+
+def test_real_backend_connects_in_the_background(monkeypatch):
+    connected = threading.Event()
+    sent = []
+    fake_tdmclient(monkeypatch, connected, sent)
+
+    created = Future()
+    threading.Thread(target=lambda: created.set_result(main.create_robot("real")), daemon=True).start()
+    robot = created.result(timeout=5)    # Must not wait for the node
+    assert robot.node is None
+
+    command = threading.Thread(target=robot.move_forward)
+    command.start()
+    command.join(0.05)
+    assert command.is_alive() and not sent     # Waits for the connection
+
+    connected.set()
+    command.join(5)
+    assert sent == ["forward"]
+
+
+def test_first_command_time_includes_a_slow_connection(monkeypatch, tmp_path):
+    connected = threading.Event()
+    sent = []
+    fake_tdmclient(monkeypatch, connected, sent)
+    threading.Timer(0.3, connected.set).start()
+
+    stats_path = tmp_path / "stats.json"
+    assert main.main(["--backend", "real", "--quiet", "--move-delay", "0", "--stats-json", str(stats_path)]) == 0
+    (stats,) = json.loads(stats_path.read_text())
+    assert sent and stats["first_command_ms"] >= 300
+
+
+def test_headless_run_never_imports_pygame(monkeypatch):
+    monkeypatch.delitem(sys.modules, "pygame", raising=False)
+    assert main.main(["--backend", "headless", "--quiet"]) == 0
+    assert "pygame" not in sys.modules
@@ -0,0 +1,41 @@
+from Environment.Block_Manager import Block, BlockManager
+from Environment.Command_Validator import validate_commands
+from Environment.Grid_Map import BLOCKED, GridMap
+from PathPlanner import PathPlanner
+
+
+def test_segments_are_planned_on_demand():
+    planner = PathPlanner(GridMap(10, 10))
+    calls = []
+    grid = planner.grid
+
+    def world():
+        calls.append(1)
+        return grid
+
+    segments = planner.stream_mission((0, 0), 0, (2, 2), (7, 6), world=world)
+    assert calls == []
+    first = next(segments)
+    assert first.phase == "approach" and calls == [1]
+    rest = list(segments)
+    assert rest[-1].block_pos == (7, 6) and len(calls) > 1
+
+
+def test_stream_follows_the_latest_world_and_validates():
+    grid = GridMap(10, 10)
+    planner = PathPlanner(grid)
+    blocks = BlockManager()
+    blocks.add_block("a", Block(2, 2, 1, 1))
+    world = {"grid": grid}
+
+    segments = planner.stream_mission((0, 0), 0, (2, 2), (7, 2), world=lambda: world["grid"])
+    pos, angle, positions = (0, 0), 0, None
+    for n, segment in enumerate(segments):
+        assert segment.phase != "failed", segment.reason
+        if n == 0:
+            # Something appears on the straight route after the robot has docked
+            world["grid"] = grid.overlay(blocked=[(5, 2)])
+        check = validate_commands(world["grid"], blocks, pos, angle, segment.commands, positions)
+        assert check.ok, check.summary()
+        pos, angle, positions = check.robot_pos, check.robot_angle, check.blocks
+    assert positions["a"] == (7, 2)
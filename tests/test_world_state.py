@@ -0,0 +1,81 @@
+import os
+import time
+from concurrent.futures import Future
+
+import pytest
+
+import main
+from Environment.Block_Manager import Block, BlockManager
+from Environment.Grid_Map import GridMap
+from Environment.Scenario import Scenario
+from Environment.World_State import SharedWorldState, attach
+from PathPlanner import PathPlanner
+from PlanningService import MissionRequest, PlanningService
+from Simulator.Thymio_Headless import HeadlessThymio
+
+
+def walled_grid():
+    grid = GridMap(12, 12)
+    for y in range(3, 9):
+        grid.set_cell(6, y, 1)
+    return grid
+
+
+def test_readers_get_one_consistent_state():
+    blocks = BlockManager()
+    blocks.add_block("a", Block(2, 2, 1, 1, 0))
+    with SharedWorldState.from_world(walled_grid(), blocks, (1, 1), 90) as world:
+        reader = attach(world.name)
+        assert reader is not world and reader.read()[:2] == ((1, 1), 90)
+
+        version = reader.grid_version
+        world.publish((3, 1), 0, {"a": (3, 2)})
+        (pos, angle, blocks_now) = reader.read()
+        assert (pos, angle) == ((3, 1), 0)
+        assert (blocks_now["a"].x, blocks_now["a"].y) == (3, 2)
+        assert reader.grid_version == version      # Pose updates don't touch the grid
+
+        world.set_cell(6, 4, 0)
+        assert reader.grid_view().get_cell(6, 4) == 0 and reader.grid_version == version + 1
+
+        with pytest.raises(RuntimeError):
+            reader.set_cell(0, 0, 1)
+
+
+@pytest.mark.parametrize("flat", [False, True])
+def test_planning_on_the_view_matches_the_grid(flat):
+    grid = walled_grid()
+    with SharedWorldState.from_world(grid) as world:
+        view = world.grid_view()
+        expected = PathPlanner(grid, flat_search=flat).plan_mission((0, 0), 0, (2, 5), (9, 5))
+        result = PathPlanner(view, flat_search=flat).plan_mission((0, 0), 0, (2, 5), (9, 5))
+        assert expected.ok and result.commands == expected.commands
+
+
+def test_process_workers_plan_on_the_live_arena():
+    with SharedWorldState.from_world(walled_grid()) as world:
+        request = MissionRequest((0, 0), 0, (2, 5), (9, 5))
+        with PlanningService(workers=2, use_processes=True) as service:
+            service.register_arena("default", world.grid_view())
+            assert service.plan_many([request])[0].ok
+
+            # Close the gaps in the wall: the workers see it without re-registering
+            with world.write():
+                for y in (0, 1, 2, 9, 10, 11):
+                    world.set_cell(6, y, 1)
+            assert not service.plan_many([request])[0].ok
+        assert os.path.exists("/dev/shm/" + world.name.lstrip("/"))
+
+
+def test_shared_world_is_removed_when_the_run_fails(monkeypatch):
+    def broken(robot, action):
+        raise RuntimeError("robot lost")
+    monkeypatch.setattr(main, "execute_action", broken)
+
+    name = f"thymio_test_{os.getpid()}"
+    args = main.parse_args(["--backend", "headless", "--quiet", "--shared-world", name])
+    robot_future = Future()
+    robot_future.set_result(HeadlessThymio())
+    with pytest.raises(RuntimeError):
+        main.run_scenario(Scenario.load(main.DEFAULT_SCENARIO), robot_future, args, time.perf_counter())
+    assert not os.path.exists("/dev/shm/" + name)